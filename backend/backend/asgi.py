@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Serve it with uvicorn (see "ASGI Serving" in the README):
+
+    uvicorn backend.asgi:application --host 0.0.0.0 --port 8000 --workers 4
 """
 
 import os
@@ -12,5 +16,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Catalog and token lookup endpoints are served by async views under ASGI
+os.environ.setdefault('ROOT_URLCONF', 'backend.urls_async')
 
 application = get_asgi_application()
@@ -0,0 +1,49 @@
+"""
+Connection pool statistics for /metrics.
+
+With DB_POOL_MODE=pool every database gets a psycopg ConnectionPool per
+process. Its counters (waits, timeouts, connections lost to failed health
+checks, ...) and current size are exported per database alias, so pool
+wait time and utilization (db_pool_in_use / db_pool_max_size) can be
+monitored and alerted on.
+"""
+from django.db import connections
+
+from backend.metrics import register_collector
+
+
+# (metric, type, description, get_stats() key, scale)
+POOL_METRICS = (
+    ('db_pool_max_size', 'gauge', 'Maximum connections in the pool', 'pool_max', 1),
+    ('db_pool_size', 'gauge', 'Connections open in the pool, in use or idle', 'pool_size', 1),
+    ('db_pool_available', 'gauge', 'Idle connections in the pool', 'pool_available', 1),
+    ('db_pool_requests_waiting', 'gauge', 'Requests currently waiting for a connection', 'requests_waiting', 1),
+    ('db_pool_requests_total', 'counter', 'Connections requested from the pool', 'requests_num', 1),
+    ('db_pool_requests_queued_total', 'counter', 'Requests that had to wait for a connection', 'requests_queued', 1),
+    ('db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a connection', 'requests_wait_ms', 0.001),
+    ('db_pool_timeouts_total', 'counter', 'Requests that gave up waiting for a connection', 'requests_errors', 1),
+    ('db_pool_connections_total', 'counter', 'Connections opened by the pool', 'connections_num', 1),
+    ('db_pool_connections_lost_total', 'counter', 'Connections found broken by the checkout health check', 'connections_lost', 1),
+)
+
+
+def pooled_aliases():
+    return [alias for alias in connections if connections.settings[alias].get('OPTIONS', {}).get('pool')]
+
+
+def collect_pool_stats():
+    stats = {alias: connections[alias].pool.get_stats() for alias in pooled_aliases()}
+    for metric, kind, description, key, scale in POOL_METRICS:
+        # psycopg_pool leaves counters that are still zero out of the stats
+        yield metric, kind, description, [
+            ((('database', alias),), values.get(key, 0) * scale) for alias, values in stats.items()
+        ]
+    yield 'db_pool_in_use', 'gauge', 'Connections checked out of the pool', [
+        ((('database', alias),), values['pool_size'] - values['pool_available']) for alias, values in stats.items()
+    ]
+
+
+def install():
+    """Export pool statistics on /metrics, if DB_POOL_MODE=pool"""
+    if pooled_aliases():
+        register_collector(collect_pool_stats)
@@ -0,0 +1,263 @@
+"""
+Per-request performance metrics.
+
+MetricsMiddleware measures total time, database time, query count and
+serialization time for every request. It sends them back in a Server-Timing
+header and aggregates them into per-route histograms, which metrics_view
+exposes to admin token holders in the Prometheus text format at /metrics,
+along with the metrics of any registered collectors (e.g. the connection
+pool's).
+
+Values for the current request are collected in a context variable, so
+they follow the request across threads and sync_to_async() under both WSGI
+and ASGI. Histograms are striped over a fixed number of shards, each thread
+sticking to one shard, so concurrent requests rarely contend for the same
+lock; a scrape merges the shards.
+"""
+import bisect
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, JsonResponse
+
+from vehicles.permissions import ADMIN_TOKEN_ERROR, has_admin_token
+
+
+# Prometheus' default latency buckets, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Total request time', DURATION_BUCKETS),
+    'http_request_db_duration_seconds': ('Time spent in database queries', DURATION_BUCKETS),
+    'http_request_db_queries': ('Database queries per request', QUERY_BUCKETS),
+    'http_request_serialization_seconds': ('Time spent serializing and rendering response data', DURATION_BUCKETS),
+}
+SHARD_COUNT = 16
+# Functions returning extra metric families for /metrics, as
+# (name, type, description, [(labels, value), ...]) tuples
+_collectors = []
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('db_time', 'db_queries', 'serialization_time')
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.serialization_time = 0.0
+
+
+def query_timer(execute, sql, params, many, context):
+    """execute_wrapper adding each query to the current request's metrics"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.db_queries += 1
+
+
+def install_query_timer(sender, connection, **kwargs):
+    # execute_wrappers outlives reconnects, so only add the wrapper once
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+connection_created.connect(install_query_timer, dispatch_uid='backend.metrics.install_query_timer')
+
+
+@contextmanager
+def track_serialization():
+    """Count the time spent in the block as serialization for the current request"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialization_time += time.perf_counter() - start
+
+
+class Shard:
+    __slots__ = ('lock', 'series')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (metric, labels) -> [count per bucket..., +Inf count, sum]
+        self.series = {}
+
+
+_shards = [Shard() for _ in range(SHARD_COUNT)]
+_shard_numbers = itertools.count()
+_local = threading.local()
+
+
+def get_shard():
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        # next() on itertools.count is atomic, so threads spread over the shards
+        shard = _local.shard = _shards[next(_shard_numbers) % SHARD_COUNT]
+    return shard
+
+
+def observe(labels, values):
+    """Add one request's {metric: value} to the histograms for `labels`"""
+    shard = get_shard()
+    with shard.lock:
+        for metric, value in values.items():
+            buckets = HISTOGRAMS[metric][1]
+            series = shard.series.get((metric, labels))
+            if series is None:
+                series = shard.series[(metric, labels)] = [0] * (len(buckets) + 2)
+            series[bisect.bisect_left(buckets, value)] += 1
+            series[-1] += value
+
+
+def collect():
+    """Histograms merged over all shards: {(metric, labels): [counts..., sum]}"""
+    merged = {}
+    for shard in _shards:
+        with shard.lock:
+            items = [(key, list(series)) for key, series in shard.series.items()]
+        for key, series in items:
+            total = merged.get(key)
+            if total is None:
+                merged[key] = series
+            else:
+                for i, value in enumerate(series):
+                    total[i] += value
+    return merged
+
+
+def format_labels(labels):
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return ','.join(f'{name}="{value}"' for name, value in escaped)
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def register_collector(collector):
+    """Add `collector`'s metric families to every /metrics scrape"""
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+
+def render_metrics():
+    merged = collect()
+    lines = []
+    for metric, (description, buckets) in HISTOGRAMS.items():
+        lines.append(f'# HELP {metric} {description}')
+        lines.append(f'# TYPE {metric} histogram')
+        for (name, labels), series in sorted(merged.items()):
+            if name != metric:
+                continue
+            label_text = format_labels(labels)
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), series):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{{label_text}}} {format_value(series[-1])}')
+            lines.append(f'{metric}_count{{{label_text}}} {cumulative}')
+    for collector in _collectors:
+        for metric, kind, description, samples in collector():
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} {kind}')
+            for labels, value in samples:
+                lines.append(f'{metric}{{{format_labels(labels)}}} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition of the per-route histograms. Requires the
+    admin token, like the admin exports: the numbers describe the
+    deployment (routes, latencies, pool sizing).
+    """
+    if not has_admin_token(request):
+        return JsonResponse({'detail': ADMIN_TOKEN_ERROR}, status=403)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class MetricsMiddleware:
+    """
+    Times every request (except /metrics itself), adds a Server-Timing header
+    and records the values in the route's histograms. Works as sync or async
+    middleware, whichever the handler needs.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(None, connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.acall(request)
+        if request.path == '/metrics':
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics, time.perf_counter() - start)
+        return response
+
+    async def acall(self, request):
+        if request.path == '/metrics':
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics, time.perf_counter() - start)
+        return response
+
+    def finish(self, request, response, metrics, total):
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.db_queries} {"query" if metrics.db_queries == 1 else "queries"}"',
+            f'serialize;dur={metrics.serialization_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+        match = request.resolver_match
+        labels = (
+            ('method', request.method),
+            ('route', f'/{match.route}' if match else '<unmatched>'),
+            ('status', response.status_code),
+        )
+        observe(labels, {
+            'http_request_duration_seconds': total,
+            'http_request_db_duration_seconds': metrics.db_time,
+            'http_request_db_queries': metrics.db_queries,
+            'http_request_serialization_seconds': metrics.serialization_time,
+        })
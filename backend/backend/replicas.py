@@ -0,0 +1,117 @@
+"""
+Read replica routing.
+
+With DB_REPLICA_HOSTS set, settings adds a `replicaN` database per replica
+and ReplicaRoutingMiddleware picks one of them for each GET/HEAD/OPTIONS
+request. ReplicaRouter sends that request's reads of the API apps' models
+to it. Writes, reads in other requests or inside a transaction, sessions
+and auth, and everything outside a request (management commands, the
+shell) use the primary, `default`.
+
+Replicas trail the primary by the replication lag, so reads that must see
+a recent write are pinned to the primary for REPLICA_PIN_SECONDS:
+
+- ?token= lookups (MyBookingsView, MyBookmarksView) after a write under
+  that token, so users always see the booking or bookmark they just made
+- every request after a catalog change, so catalog responses cached
+  against the new catalog version are never read from a lagging replica
+
+Pins are kept in the cache; set REDIS_URL to share them between processes.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+# Apps whose models are read from replicas
+REPLICA_APPS = frozenset({'vehicles', 'bookings', 'bookmarks'})
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+CATALOG_PIN = 'catalog'
+
+_read_database = ContextVar('read_database', default=None)
+
+
+def pin_key(name):
+    return f'replicas:pin:{name}'
+
+
+def pin_to_primary(name):
+    """Read requests for `name` (a token, or CATALOG_PIN) from the primary for REPLICA_PIN_SECONDS"""
+    if settings.DATABASE_REPLICAS and name:
+        cache.set(pin_key(name), True, settings.REPLICA_PIN_SECONDS)
+
+
+def request_pins(request):
+    keys = [pin_key(CATALOG_PIN)]
+    token = request.GET.get('token')
+    if token:
+        keys.append(pin_key(token))
+    return keys
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_database.get()
+        if alias is None or model._meta.app_label not in REPLICA_APPS:
+            return None
+        if connections['default'].in_atomic_block:
+            # Reads inside a transaction must see its writes
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Chooses the database the request's ORM reads are routed to: a random
+    replica for safe requests that aren't pinned, otherwise the primary.
+    Not loaded when no replicas are configured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.acall(request)
+        alias = None
+        if request.method in SAFE_METHODS and not cache.get_many(request_pins(request)):
+            alias = random.choice(settings.DATABASE_REPLICAS)
+        token = _read_database.set(alias)
+        try:
+            return self.get_response(request)
+        finally:
+            _read_database.reset(token)
+
+    async def acall(self, request):
+        alias = None
+        if request.method in SAFE_METHODS and not await cache.aget_many(request_pins(request)):
+            alias = random.choice(settings.DATABASE_REPLICAS)
+        token = _read_database.set(alias)
+        try:
+            return await self.get_response(request)
+        finally:
+            _read_database.reset(token)
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'corsheaders',
@@ -56,6 +58,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its total time covers the rest of the stack
+    'backend.metrics.MetricsMiddleware',
+    'backend.replicas.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -66,7 +71,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'backend.urls'
+# backend/asgi.py switches to backend.urls_async, which serves the read
+# endpoints with async views
+ROOT_URLCONF = os.getenv('ROOT_URLCONF', 'backend.urls')
 
 TEMPLATES = [
     {
@@ -100,6 +107,124 @@ DATABASES = {
     }
 }
 
+# Connection handling, applied to the primary and its replicas:
+#   none        a new connection for every request (Django's default)
+#   persistent  each thread keeps its connection for DB_CONN_MAX_AGE seconds
+#   pool        a psycopg connection pool of DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE
+#               connections per process, shared by all threads; requires
+#               psycopg[pool] (psycopg 3) instead of psycopg2
+# Reused connections are health-checked before each request uses them: by
+# Django in persistent mode, by the pool on checkout in pool mode.
+DB_POOL_MODE = os.getenv('DB_POOL_MODE', 'none')
+if DB_POOL_MODE == 'persistent':
+    DATABASES['default'].update(
+        CONN_MAX_AGE=int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        CONN_HEALTH_CHECKS=True,
+    )
+elif DB_POOL_MODE == 'pool':
+    from psycopg_pool import ConnectionPool
+
+    DATABASES['default'].update(
+        OPTIONS={'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            # Seconds a request waits for a free connection before failing
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            # Django takes a fresh connection from the pool for every request,
+            # so CONN_HEALTH_CHECKS never applies; the pool checks it instead
+            'check': ConnectionPool.check_connection,
+        }},
+    )
+elif DB_POOL_MODE != 'none':
+    raise ImproperlyConfigured('DB_POOL_MODE must be one of: none, persistent, pool.')
+
+# Read replicas of the primary, as comma-separated HOST[:PORT] entries. Each
+# becomes a `replicaN` database with the primary's name and credentials;
+# backend/replicas.py decides which reads go to them.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').replace(' ', '').split(',')), 1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['backend.replicas.ReplicaRouter']
+# After a write under a booking/bookmark token, or a catalog change, the
+# affected reads stay on the primary for this long (covers replication lag)
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '10'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default. Set REDIS_URL to share cached counts and responses,
+# replica pins and the catalog version between worker processes. Cache entries
+# are keyed on the catalog version, which lives in the database, so
+# invalidation reaches every process either way.
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Vehicle list counts are cached per filter combination and invalidated on
+# every vehicle write; the timeout only bounds how long an idle entry lives.
+VEHICLE_COUNT_CACHE_TIMEOUT = int(os.getenv('VEHICLE_COUNT_CACHE_TIMEOUT', '300'))
+# With ?count=estimate, result sets the planner expects to be at least this
+# large report the planner's estimate instead of an exact COUNT(*).
+VEHICLE_COUNT_ESTIMATE_THRESHOLD = int(os.getenv('VEHICLE_COUNT_ESTIMATE_THRESHOLD', '10000'))
+
+# Rendered GET responses of the catalog endpoints (/api/vehicles, detail and
+# summary) are cached against the catalog version and served with an ETag.
+CATALOG_RESPONSE_CACHE_TIMEOUT = int(os.getenv('CATALOG_RESPONSE_CACHE_TIMEOUT', '600'))
+# The catalog version is re-read from the database at most this often, so
+# writes made outside the API (which don't expire it on commit) show up in
+# cached catalog responses after at most this many seconds.
+CATALOG_VERSION_CACHE_TIMEOUT = int(os.getenv('CATALOG_VERSION_CACHE_TIMEOUT', '2'))
+
+# Lower bounds (INR) of the price histogram buckets returned by
+# /api/vehicles/facets; the last bucket is open-ended.
+VEHICLE_PRICE_BUCKETS = [0, 1000000, 2000000, 3000000, 4000000, 5000000, 7500000, 10000000]
+
+# /api/vehicles/autocomplete: prefixes up to AUTOCOMPLETE_TRIE_DEPTH characters
+# are answered from an in-process trie over the AUTOCOMPLETE_TRIE_MAX_TERMS
+# most common brands/models; longer prefixes query the trigram indexes. The
+# trie checks the catalog version at most every AUTOCOMPLETE_TRIE_CHECK_SECONDS.
+AUTOCOMPLETE_DEFAULT_LIMIT = 8
+AUTOCOMPLETE_MAX_LIMIT = 20
+AUTOCOMPLETE_TRIE_DEPTH = int(os.getenv('AUTOCOMPLETE_TRIE_DEPTH', '6'))
+AUTOCOMPLETE_TRIE_MAX_TERMS = int(os.getenv('AUTOCOMPLETE_TRIE_MAX_TERMS', '50000'))
+AUTOCOMPLETE_TRIE_CHECK_SECONDS = float(os.getenv('AUTOCOMPLETE_TRIE_CHECK_SECONDS', '1'))
+
+# Rows fetched per round trip from the server-side cursor behind the
+# streaming exports (/api/vehicles/export, /api/bookings/export)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Largest number of bookings accepted by one POST /api/bookings/batch
+BOOKING_BATCH_MAX_SIZE = int(os.getenv('BOOKING_BATCH_MAX_SIZE', '50'))
+
+# Slow query log (off unless SLOW_QUERY_THRESHOLD_MS is set): queries slower
+# than the threshold are appended to SLOW_QUERY_LOG as JSON Lines. SELECTs get
+# an EXPLAIN (ANALYZE, BUFFERS) plan at most once per
+# SLOW_QUERY_EXPLAIN_INTERVAL seconds per query fingerprint.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '0'))
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', str(BASE_DIR / 'slow_queries.jsonl'))
+SLOW_QUERY_EXPLAIN_INTERVAL = int(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', '300'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -149,4 +274,8 @@ CORS_ALLOW_ALL_ORIGINS = True
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'vehicles.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
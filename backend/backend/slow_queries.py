@@ -0,0 +1,131 @@
+"""
+Opt-in slow query log.
+
+With SLOW_QUERY_THRESHOLD_MS set, every query slower than the threshold is
+appended to SLOW_QUERY_LOG (JSON Lines) with its normalized SQL and a
+fingerprint that is the same for every execution of the same query shape,
+whatever the parameter values. SELECTs also get an EXPLAIN (ANALYZE,
+BUFFERS) plan, sampled at most once per SLOW_QUERY_EXPLAIN_INTERVAL seconds
+per fingerprint. `manage.py top_slow_queries` summarizes the log.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER = re.compile(r'%s|\$\d+|%\(\w+\)s')
+VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+_lock = threading.Lock()
+# fingerprint -> time.monotonic() of its last EXPLAIN
+_last_explained = {}
+
+
+def normalize_sql(sql):
+    """
+    SQL with literals and placeholders replaced by ?, so the queries behind
+    e.g. different brand filters or pages share one normalized form. Lists
+    of values (IN (...)) collapse to one entry whatever their length.
+    """
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = PLACEHOLDER.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    sql = VALUE_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def should_explain(key):
+    now = time.monotonic()
+    with _lock:
+        last = _last_explained.get(key)
+        if last is not None and now - last < settings.SLOW_QUERY_EXPLAIN_INTERVAL:
+            return False
+        _last_explained[key] = now
+        return True
+
+
+def explain(connection, sql, params):
+    """
+    EXPLAIN (ANALYZE, BUFFERS) the query on the same connection, so it sees
+    the same transaction state. It goes through a raw driver cursor, which
+    bypasses Django's execute wrappers: the EXPLAIN is neither logged nor
+    explained itself. Inside a transaction it runs in a savepoint so a
+    failing EXPLAIN cannot abort the caller's transaction.
+    """
+    in_transaction = not connection.get_autocommit()
+    with connection.connection.cursor() as cursor:
+        if in_transaction:
+            cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        except Exception as exc:
+            if in_transaction:
+                cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            return {'error': str(exc).strip()}
+        finally:
+            if in_transaction:
+                cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+    # psycopg2 decodes the json column, some drivers return text
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+
+def write_entry(entry):
+    line = json.dumps(entry, default=str) + '\n'
+    with _lock:
+        with open(settings.SLOW_QUERY_LOG, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+
+def slow_query_logger(execute, sql, params, many, context):
+    """execute_wrapper logging queries slower than SLOW_QUERY_THRESHOLD_MS"""
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = (time.perf_counter() - start) * 1000
+    if duration < settings.SLOW_QUERY_THRESHOLD_MS:
+        return result
+
+    connection = context['connection']
+    normalized = normalize_sql(sql)
+    key = fingerprint(normalized)
+    entry = {
+        'time': datetime.now(timezone.utc).isoformat(),
+        'fingerprint': key,
+        'duration_ms': round(duration, 3),
+        'database': connection.alias,
+        'sql': normalized,
+    }
+    # Only SELECTs are re-run: EXPLAIN ANALYZE executes the statement
+    if not many and sql.lstrip()[:6].upper() == 'SELECT' and should_explain(key):
+        entry['plan'] = explain(connection, sql, params)
+    write_entry(entry)
+    return result
+
+
+def install_slow_query_logger(sender, connection, **kwargs):
+    # execute_wrappers outlives reconnects, so only add the wrapper once
+    if slow_query_logger not in connection.execute_wrappers:
+        connection.execute_wrappers.append(slow_query_logger)
+
+
+def install():
+    """Log slow queries on every connection, if SLOW_QUERY_THRESHOLD_MS is set"""
+    if not settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+    connection_created.connect(install_slow_query_logger, dispatch_uid='backend.slow_queries.install')
+    for connection in connections.all(initialized_only=True):
+        install_slow_query_logger(None, connection)
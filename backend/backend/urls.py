@@ -16,9 +16,15 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from vehicles.views import VehicleListCreateView, VehicleDetailView, vehicle_summary
-from bookmarks.views import BookmarkListCreateView, BookmarkDeleteView, MyBookmarksView as MyBookmarksListView
-from bookings.views import BookingCreateView, MyBookingsView
+from backend.metrics import metrics_view
+from vehicles.views import (
+    VehicleListCreateView, VehicleDetailView, vehicle_autocomplete, vehicle_export, vehicle_facets, vehicle_summary,
+)
+from bookmarks.views import (
+    BookmarkBulkView, BookmarkListCreateView, BookmarkDeleteView, BookmarkToggleView,
+    MyBookmarksView as MyBookmarksListView,
+)
+from bookings.views import BookingBatchCreateView, BookingCreateView, MyBookingsView, booking_export
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,7 +33,15 @@ urlpatterns = [
     path('api/bookmarks', BookmarkListCreateView.as_view()),
     path('api/bookmarks/<int:pk>', BookmarkDeleteView.as_view()),
     path('api/bookmarks/my', MyBookmarksListView.as_view()),
+    path('api/bookmarks/bulk', BookmarkBulkView.as_view()),
+    path('api/bookmarks/toggle', BookmarkToggleView.as_view()),
     path('api/bookings', BookingCreateView.as_view()),
     path('api/bookings/my', MyBookingsView.as_view()),
+    path('api/bookings/batch', BookingBatchCreateView.as_view()),
+    path('api/bookings/export', booking_export),
     path('api/vehicles/summary', vehicle_summary),
+    path('api/vehicles/facets', vehicle_facets),
+    path('api/vehicles/autocomplete', vehicle_autocomplete),
+    path('api/vehicles/export', vehicle_export),
+    path('metrics', metrics_view),
 ]
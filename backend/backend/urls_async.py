@@ -0,0 +1,22 @@
+"""
+URL configuration for serving the project over ASGI (see backend/asgi.py).
+
+Same routes as backend.urls, with the catalog and token lookup endpoints
+served by their async views.
+"""
+from django.urls import path
+from vehicles import async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+ASYNC_VIEWS = {
+    'api/vehicles': async_views.vehicle_list,
+    'api/vehicles/<int:pk>': async_views.vehicle_detail,
+    'api/vehicles/summary': async_views.vehicle_summary,
+    'api/bookings/my': async_views.my_bookings,
+    'api/bookmarks/my': async_views.my_bookmarks,
+}
+
+urlpatterns = [
+    path(route, ASYNC_VIEWS[route]) if route in ASYNC_VIEWS else pattern
+    for pattern, route in ((pattern, str(pattern.pattern)) for pattern in sync_urlpatterns)
+]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_booking_booking_token_created_idx'),
+        ('vehicles', '0007_vehicle_brand_name_uniq'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['created_at', 'id'], name='booking_created_id_idx'),
+        ),
+    ]
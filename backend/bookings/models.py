@@ -27,6 +27,8 @@ class Booking(models.Model):
         indexes = [
             # Composite index for token filtering with ordering (most common query pattern)
             models.Index(fields=['booking_token', '-created_at'], name='booking_token_created_idx'),
+            # Date range scans of the admin export, returned in index order
+            models.Index(fields=['created_at', 'id'], name='booking_created_id_idx'),
         ]
 
     def __str__(self):
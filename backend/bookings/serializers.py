@@ -1,15 +1,20 @@
 from rest_framework import serializers
 from .models import Booking
-from vehicles.serializers import VehicleSerializer
+from vehicles.serializers import SparseFieldsMixin, VehicleSerializer
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = '__all__'
         read_only_fields = ('created_at',)
         # booking_token is NOT read-only - we allow it to be set if provided
     
+    def __init__(self, *args, **kwargs):
+        # Field names to render for the embedded vehicle (None for all)
+        self.vehicle_fields = kwargs.pop('vehicle_fields', None)
+        super().__init__(*args, **kwargs)
+
     def to_representation(self, instance):
         # Override to include full vehicle object in response instead of just ID
         representation = super().to_representation(instance)
@@ -18,5 +23,17 @@ class BookingSerializer(serializers.ModelSerializer):
             # Use cached vehicle if available (from select_related)
             vehicle = getattr(instance, 'vehicle', None)
             if vehicle:
-                representation['vehicle'] = VehicleSerializer(vehicle).data
+                representation['vehicle'] = VehicleSerializer(vehicle, fields=self.vehicle_fields).data
         return representation
+
+
+class BookingBatchItemSerializer(serializers.ModelSerializer):
+    """
+    One entry of a batch booking request. The vehicle is taken as a plain id
+    so the whole batch can be checked with a single IN query by the view.
+    """
+    vehicle = serializers.IntegerField()
+
+    class Meta:
+        model = Booking
+        fields = ('vehicle', 'customer_name', 'customer_email', 'booking_token')
@@ -1,3 +1,121 @@
-from django.test import TestCase
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from vehicles.models import Vehicle
+from vehicles.read_plans import get_read_plan
+from vehicles.renderers import ORJSONRenderer
+from vehicles.serializers import VehicleSerializer
+from .models import Booking
+from .serializers import BookingSerializer
+
+
+class BookingTestCase(APITestCase):
+    def setUp(self):
+        self.vehicles = Vehicle.objects.bulk_create(
+            Vehicle(
+                brand='Tata', name=f'Model {i}', price=800000, fuel_type='Petrol',
+                image_url='https://example.com/car.jpg', description='A car',
+            )
+            for i in range(3)
+        )
+
+    def booking(self, vehicle, **extra):
+        return {'vehicle': vehicle, 'customer_name': 'Priya Sharma', 'customer_email': 'priya@example.com', **extra}
+
+
+class BookingBatchTests(BookingTestCase):
+    def test_books_every_vehicle_under_one_token(self):
+        response = self.client.post(
+            '/api/bookings/batch', [self.booking(vehicle.pk) for vehicle in self.vehicles], format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        tokens = {booking['booking_token'] for booking in response.json()}
+        self.assertEqual(len(tokens), 1)
+        self.assertEqual(Booking.objects.filter(booking_token__in=tokens).count(), 3)
+        # Vehicles are embedded as on POST /api/bookings
+        self.assertEqual(response.json()[0]['vehicle']['id'], self.vehicles[0].pk)
+
+    def test_reuses_the_given_token(self):
+        response = self.client.post(
+            '/api/bookings/batch',
+            [self.booking(self.vehicles[0].pk, booking_token='abc'), self.booking(self.vehicles[1].pk)],
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Booking.objects.filter(booking_token='abc').count(), 2)
+
+    def test_unknown_vehicle_books_nothing(self):
+        response = self.client.post(
+            '/api/bookings/batch', [self.booking(self.vehicles[0].pk), self.booking(0)], format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()[0], {})
+        self.assertIn('vehicle', response.json()[1])
+        self.assertFalse(Booking.objects.exists())
+
+    def test_invalid_entry_books_nothing(self):
+        response = self.client.post(
+            '/api/bookings/batch',
+            [self.booking(self.vehicles[0].pk), self.booking(self.vehicles[1].pk, customer_email='nope')],
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('customer_email', response.json()[1])
+        self.assertFalse(Booking.objects.exists())
+
+    def test_conflicting_tokens_book_nothing(self):
+        response = self.client.post(
+            '/api/bookings/batch',
+            [self.booking(self.vehicles[0].pk, booking_token='a'), self.booking(self.vehicles[1].pk, booking_token='b')],
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('booking_token', response.json())
+        self.assertFalse(Booking.objects.exists())
+
+    def test_empty_batch(self):
+        self.assertEqual(self.client.post('/api/bookings/batch', [], format='json').status_code, 400)
+
+    @override_settings(BOOKING_BATCH_MAX_SIZE=2)
+    def test_batch_size_limit(self):
+        response = self.client.post(
+            '/api/bookings/batch', [self.booking(vehicle.pk) for vehicle in self.vehicles], format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Booking.objects.exists())
+
+
+class MyBookingsTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        for vehicle in self.vehicles:
+            Booking.objects.create(booking_token='abc', **self.booking(vehicle))
+        Booking.objects.create(booking_token='other', **self.booking(self.vehicles[0]))
+
+    def test_read_plan_matches_serializer(self):
+        queryset = Booking.objects.filter(booking_token='abc').select_related('vehicle').order_by('-created_at')
+        plan = get_read_plan(BookingSerializer, None, (('vehicle', VehicleSerializer, None),))
+        self.assertEqual(
+            ORJSONRenderer().render(plan.serialize(plan.values(queryset))),
+            JSONRenderer().render(BookingSerializer(queryset, many=True).data),
+        )
+
+    def test_lists_the_token_bookings(self):
+        response = self.client.get('/api/bookings/my', {'token': 'abc'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 3)
+        queryset = Booking.objects.filter(booking_token='abc').order_by('-created_at')
+        self.assertEqual(response.json()['results'], BookingSerializer(queryset, many=True).data)
+
+    def test_compact_embed(self):
+        response = self.client.get('/api/bookings/my', {'token': 'abc', 'embed': 'compact'})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(
+            {booking['vehicle'] for booking in body['results']},
+            {vehicle['id'] for vehicle in body['included']['vehicles'].values()},
+        )
+
+    def test_without_token(self):
+        self.assertEqual(self.client.get('/api/bookings/my').json()['count'], 0)
@@ -1,8 +1,24 @@
+from django.conf import settings
+from django.db import router, transaction
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import CreateAPIView, ListAPIView
 from rest_framework.response import Response
 from rest_framework import status
+from backend.replicas import pin_to_primary
 from .models import Booking, generate_booking_token
-from .serializers import BookingSerializer
+from .serializers import BookingBatchItemSerializer, BookingSerializer
+from vehicles.models import Vehicle
+from vehicles.embedding import CompactEmbedMixin
+from vehicles.pagination import AsyncPageNumberPagination
+from vehicles.export import get_export_format, invalid_format_response, streaming_export
+from vehicles.fieldsets import Fieldset, restrict_embedded_vehicle_queryset
+from vehicles.permissions import ADMIN_TOKEN_ERROR, has_admin_token
+from vehicles.read_plans import datetime_to_iso, get_read_plan
+from vehicles.serializers import VehicleSerializer
 
 
 class BookingCreateView(CreateAPIView):
@@ -22,21 +38,198 @@ class BookingCreateView(CreateAPIView):
         
         # Save with the token (either provided or generated)
         booking = serializer.save(booking_token=booking_token)
+        # Show it in this token's next MyBookingsView reads
+        pin_to_primary(booking_token)
         
         # Return the booking with token
         response_serializer = BookingSerializer(booking)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
 
-class MyBookingsView(ListAPIView):
+class BookingBatchCreateView(CreateAPIView):
+    """
+    Book several vehicles in one request.
+    Body: a list of bookings, each shaped like a POST /api/bookings payload.
+    All bookings share one booking_token: the one given in the payload (every
+    entry that sets it must agree) or a newly generated one.
+    """
+    serializer_class = BookingBatchItemSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(many=True, allow_empty=False, max_length=settings.BOOKING_BATCH_MAX_SIZE)
+        return super().get_serializer(*args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data
+
+        tokens = {item['booking_token'] for item in items if item.get('booking_token')}
+        if len(tokens) > 1:
+            raise ValidationError({'booking_token': ['All bookings in a batch must share one booking_token.']})
+        booking_token = tokens.pop() if tokens else generate_booking_token()
+
+        # One IN query for every vehicle in the batch; the same map is used
+        # to embed the vehicles in the response
+        vehicles = Vehicle.objects.in_bulk({item['vehicle'] for item in items})
+        errors = [
+            {} if item['vehicle'] in vehicles
+            else {'vehicle': [f'Invalid pk "{item["vehicle"]}" - object does not exist.']}
+            for item in items
+        ]
+        if any(errors):
+            raise ValidationError(errors)
+
+        with transaction.atomic():
+            bookings = Booking.objects.bulk_create([
+                Booking(
+                    vehicle=vehicles[item['vehicle']],
+                    customer_name=item['customer_name'],
+                    customer_email=item['customer_email'],
+                    booking_token=booking_token,
+                )
+                for item in items
+            ])
+        pin_to_primary(booking_token)
+
+        return Response(BookingSerializer(bookings, many=True).data, status=status.HTTP_201_CREATED)
+
+
+class MyBookingsView(CompactEmbedMixin, ListAPIView):
     """
     List bookings for a specific booking token.
     Token should be provided as query parameter: ?token=<booking_token>
+    With ?embed=compact, vehicles are returned once in included.vehicles.
     """
     serializer_class = BookingSerializer
+    pagination_class = AsyncPageNumberPagination
     
     def get_queryset(self):
         booking_token = self.request.query_params.get('token')
         if not booking_token:
             return Booking.objects.none()
-        return Booking.objects.filter(booking_token=booking_token).select_related('vehicle').order_by('-created_at')
+        queryset = Booking.objects.filter(booking_token=booking_token).order_by('-created_at')
+
+        fields = self.get_rendered_fields()
+        if fields is not None:
+            return restrict_embedded_vehicle_queryset(queryset, *fields)
+        return queryset.select_related('vehicle').defer('vehicle__search_vector')
+
+    def get_rendered_fields(self):
+        """
+        (booking fields, vehicle fields) selected with ?fields=/?omit=,
+        or None when the full representation was requested.
+        """
+        fieldset = Fieldset.from_request(self.request)
+        if not fieldset.is_restricted:
+            return None
+        return (
+            fieldset.select(BookingSerializer.get_renderable_fields()),
+            fieldset.nested('vehicle').select(VehicleSerializer.get_renderable_fields()),
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_rendered_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields[0])
+            kwargs.setdefault('vehicle_fields', fields[1])
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        booking_fields, vehicle_fields = self.get_rendered_fields() or (None, None)
+        if self.is_compact_embed():
+            return self.list_compact(booking_fields, vehicle_fields)
+
+        # Serialize JSON responses straight from values_list() rows, with the
+        # vehicle columns fetched through the join in the same query
+        if request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+
+        plan, queryset = self.get_planned_queryset(booking_fields, vehicle_fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.serialize(page))
+        return Response(plan.serialize(queryset))
+
+    async def alist(self, request, *args, **kwargs):
+        """JSON list() with the async ORM, for the ASGI read path"""
+        booking_fields, vehicle_fields = self.get_rendered_fields() or (None, None)
+        if self.is_compact_embed():
+            return await self.alist_compact(booking_fields, vehicle_fields)
+
+        plan, queryset = self.get_planned_queryset(booking_fields, vehicle_fields)
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.serialize(page))
+        return Response(plan.serialize([row async for row in queryset]))
+
+    def get_planned_queryset(self, booking_fields, vehicle_fields):
+        """(read plan, values_list() queryset) rendering each booking with its vehicle"""
+        plan = get_read_plan(
+            BookingSerializer,
+            None if booking_fields is None else tuple(booking_fields),
+            (('vehicle', VehicleSerializer, None if vehicle_fields is None else tuple(vehicle_fields)),),
+        )
+        return plan, plan.values(self.filter_queryset(self.get_queryset()))
+
+
+BOOKING_EXPORT_COLUMNS = (
+    'id', 'created_at', 'customer_name', 'customer_email', 'vehicle_id', 'vehicle_brand', 'vehicle_name',
+)
+
+
+def parse_export_bound(value):
+    """Aware datetime from an ISO date or datetime; naive values are in the current time zone"""
+    try:
+        parsed = parse_datetime(value or '')
+    except ValueError:
+        parsed = None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+@require_GET
+def booking_export(request):
+    """
+    Stream the bookings created in [?from=, ?to=) with their vehicle's brand
+    and name, as NDJSON (default) or CSV with ?format=ndjson|csv. Bounds are
+    ISO dates or datetimes; `to` defaults to now. Requires the admin token.
+
+    Rows are read in created_at order through booking_created_id_idx with a
+    server-side cursor, so memory stays flat for any range. Booking tokens
+    are left out: they grant access to a guest's bookings.
+    """
+    if not has_admin_token(request):
+        return JsonResponse({'detail': ADMIN_TOKEN_ERROR}, status=status.HTTP_403_FORBIDDEN)
+    export_format = get_export_format(request)
+    if export_format is None:
+        return invalid_format_response()
+
+    start = parse_export_bound(request.GET.get('from'))
+    end = parse_export_bound(request.GET.get('to')) if request.GET.get('to') else timezone.now()
+    if start is None or end is None:
+        return JsonResponse(
+            {'detail': '"from" (required) and "to" must be ISO 8601 dates or datetimes.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # The body is streamed after the middleware has returned, so resolve the
+    # read database (possibly a replica) while the request is routed
+    rows = (
+        Booking.objects
+        .using(router.db_for_read(Booking))
+        .filter(created_at__gte=start, created_at__lt=end)
+        .order_by('created_at', 'id')
+        .values_list(
+            'id', 'created_at', 'customer_name', 'customer_email', 'vehicle_id', 'vehicle__brand', 'vehicle__name',
+        )
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+    tz = timezone.get_current_timezone()
+    records = (
+        dict(zip(BOOKING_EXPORT_COLUMNS, (pk, datetime_to_iso(created_at, tz), *rest)))
+        for pk, created_at, *rest in rows
+    )
+    filename = f'bookings-{start.date().isoformat()}-{end.date().isoformat()}'
+    return streaming_export(records, BOOKING_EXPORT_COLUMNS, export_format, filename)
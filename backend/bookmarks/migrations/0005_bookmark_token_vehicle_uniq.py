@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-17 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookmarks', '0004_bookmark_bookmark_token_created_idx'),
+        ('vehicles', '0006_vehicle_trigram_indexes'),
+    ]
+
+    operations = [
+        # Drop duplicate (token, vehicle) rows, keeping the oldest one, so the
+        # constraint can be created
+        migrations.RunSQL(
+            sql="""
+                DELETE FROM bookmarks_bookmark b
+                USING bookmarks_bookmark keep
+                WHERE b.bookmark_token = keep.bookmark_token
+                  AND b.vehicle_id = keep.vehicle_id
+                  AND b.id > keep.id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='bookmark',
+            constraint=models.UniqueConstraint(fields=('bookmark_token', 'vehicle'), name='bookmark_token_vehicle_uniq'),
+        ),
+    ]
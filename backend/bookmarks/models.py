@@ -26,6 +26,11 @@ class Bookmark(models.Model):
             # Composite index for token filtering with ordering (most common query pattern)
             models.Index(fields=['bookmark_token', '-created_at'], name='bookmark_token_created_idx'),
         ]
+        constraints = [
+            # A vehicle is bookmarked at most once per token; bulk adds rely on
+            # it for INSERT ... ON CONFLICT DO NOTHING
+            models.UniqueConstraint(fields=['bookmark_token', 'vehicle'], name='bookmark_token_vehicle_uniq'),
+        ]
 
     def __str__(self):
         return f"Bookmark: {self.vehicle}"
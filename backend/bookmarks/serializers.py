@@ -1,15 +1,23 @@
 from rest_framework import serializers
 from .models import Bookmark
-from vehicles.serializers import VehicleSerializer
+from vehicles.serializers import SparseFieldsMixin, VehicleSerializer
 
 
-class BookmarkSerializer(serializers.ModelSerializer):
+class BookmarkSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Bookmark
         fields = '__all__'
         read_only_fields = ('created_at',)
         # bookmark_token is NOT read-only - we allow it to be set if provided
+        # Creating an existing (token, vehicle) bookmark returns the existing
+        # row instead of failing the unique-together check
+        validators = []
     
+    def __init__(self, *args, **kwargs):
+        # Field names to render for the embedded vehicle (None for all)
+        self.vehicle_fields = kwargs.pop('vehicle_fields', None)
+        super().__init__(*args, **kwargs)
+
     def to_representation(self, instance):
         # Override to include full vehicle object in response instead of just ID
         representation = super().to_representation(instance)
@@ -18,5 +26,29 @@ class BookmarkSerializer(serializers.ModelSerializer):
             # Use cached vehicle if available (from select_related)
             vehicle = getattr(instance, 'vehicle', None)
             if vehicle:
-                representation['vehicle'] = VehicleSerializer(vehicle).data
+                representation['vehicle'] = VehicleSerializer(vehicle, fields=self.vehicle_fields).data
         return representation
+
+
+class BookmarkBulkSerializer(serializers.Serializer):
+    """Vehicle ids to add to and/or remove from one bookmark token"""
+    bookmark_token = serializers.CharField(max_length=64, required=False)
+    add = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+    remove = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+
+    def validate(self, attrs):
+        add, remove = set(attrs.get('add', [])), set(attrs.get('remove', []))
+        if not add and not remove:
+            raise serializers.ValidationError('Provide vehicle ids to "add" and/or "remove".')
+        if remove and not attrs.get('bookmark_token'):
+            raise serializers.ValidationError({'bookmark_token': ['Required when removing bookmarks.']})
+        if add & remove:
+            raise serializers.ValidationError('A vehicle cannot be both added and removed.')
+        return attrs
+
+
+class BookmarkToggleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Bookmark
+        fields = ('vehicle', 'bookmark_token')
+        validators = []
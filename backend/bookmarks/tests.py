@@ -1,3 +1,110 @@
-from django.test import TestCase
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from vehicles.models import Vehicle
+from .models import Bookmark
+from .serializers import BookmarkSerializer
+
+
+class BookmarkTestCase(APITestCase):
+    def setUp(self):
+        self.vehicles = Vehicle.objects.bulk_create(
+            Vehicle(
+                brand='Tata', name=f'Model {i}', price=800000, fuel_type='Petrol',
+                image_url='https://example.com/car.jpg', description='A car',
+            )
+            for i in range(3)
+        )
+        self.ids = [vehicle.pk for vehicle in self.vehicles]
+
+
+class BookmarkCreateTests(BookmarkTestCase):
+    def test_bookmarking_twice_returns_the_existing_bookmark(self):
+        first = self.client.post('/api/bookmarks', {'vehicle': self.ids[0], 'bookmark_token': 'abc'}, format='json')
+        second = self.client.post('/api/bookmarks', {'vehicle': self.ids[0], 'bookmark_token': 'abc'}, format='json')
+        self.assertEqual((first.status_code, second.status_code), (201, 200))
+        self.assertEqual(first.json()['id'], second.json()['id'])
+        self.assertEqual(Bookmark.objects.filter(bookmark_token='abc').count(), 1)
+
+
+class BookmarkBulkTests(BookmarkTestCase):
+    def bulk(self, **data):
+        return self.client.post('/api/bookmarks/bulk', data, format='json')
+
+    def test_add_is_idempotent(self):
+        response = self.bulk(bookmark_token='abc', add=[self.ids[0], self.ids[1], self.ids[0]])
+        self.assertEqual(response.status_code, 200)
+        response = self.bulk(bookmark_token='abc', add=[self.ids[1], self.ids[2]])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.json()['vehicles']), sorted(self.ids))
+        self.assertEqual(Bookmark.objects.filter(bookmark_token='abc').count(), 3)
+
+    def test_add_and_remove(self):
+        self.bulk(bookmark_token='abc', add=self.ids[:2])
+        response = self.bulk(bookmark_token='abc', add=[self.ids[2]], remove=[self.ids[0], 0])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.json()['vehicles']), self.ids[1:])
+
+    def test_generates_a_token(self):
+        response = self.bulk(add=[self.ids[0]])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Bookmark.objects.filter(bookmark_token=response.json()['bookmark_token']).exists())
+
+    def test_unknown_vehicle_adds_nothing(self):
+        response = self.bulk(bookmark_token='abc', add=[self.ids[0], 0])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('add', response.json())
+        self.assertFalse(Bookmark.objects.exists())
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.bulk(bookmark_token='abc').status_code, 400)
+        self.assertEqual(self.bulk(remove=[self.ids[0]]).status_code, 400)
+        self.assertEqual(self.bulk(bookmark_token='abc', add=[self.ids[0]], remove=[self.ids[0]]).status_code, 400)
+
+
+class BookmarkToggleTests(BookmarkTestCase):
+    def toggle(self, vehicle, token=None):
+        data = {'vehicle': vehicle} if token is None else {'vehicle': vehicle, 'bookmark_token': token}
+        response = self.client.post('/api/bookmarks/toggle', data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_toggle_on_and_off(self):
+        first = self.toggle(self.ids[0])
+        self.assertTrue(first['bookmarked'])
+        token = first['bookmark_token']
+        self.assertEqual(Bookmark.objects.filter(bookmark_token=token).count(), 1)
+
+        self.assertFalse(self.toggle(self.ids[0], token)['bookmarked'])
+        self.assertFalse(Bookmark.objects.filter(bookmark_token=token).exists())
+
+        self.assertTrue(self.toggle(self.ids[0], token)['bookmarked'])
+        self.assertEqual(Bookmark.objects.filter(bookmark_token=token).count(), 1)
+
+    def test_only_touches_the_token(self):
+        Bookmark.objects.create(bookmark_token='other', vehicle=self.vehicles[0])
+        self.assertTrue(self.toggle(self.ids[0], 'abc')['bookmarked'])
+        self.assertEqual(Bookmark.objects.filter(vehicle=self.vehicles[0]).count(), 2)
+
+    def test_unknown_vehicle(self):
+        response = self.client.post('/api/bookmarks/toggle', {'vehicle': 0}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class MyBookmarksTests(BookmarkTestCase):
+    def test_lists_the_token_bookmarks(self):
+        for vehicle in self.vehicles:
+            Bookmark.objects.create(bookmark_token='abc', vehicle=vehicle)
+        Bookmark.objects.create(bookmark_token='other', vehicle=self.vehicles[0])
+
+        response = self.client.get('/api/bookmarks/my', {'token': 'abc'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 3)
+        queryset = Bookmark.objects.filter(bookmark_token='abc').order_by('-created_at')
+        self.assertEqual(response.json()['results'], BookmarkSerializer(queryset, many=True).data)
+
+    def test_sparse_fields(self):
+        Bookmark.objects.create(bookmark_token='abc', vehicle=self.vehicles[0])
+        response = self.client.get('/api/bookmarks/my', {'token': 'abc', 'fields': 'id,vehicle.name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.json()['results'][0]), ['id', 'vehicle'])
+        self.assertEqual(response.json()['results'][0]['vehicle'], {'name': self.vehicles[0].name})
@@ -1,8 +1,17 @@
-from rest_framework.generics import ListCreateAPIView, DestroyAPIView, ListAPIView
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import GenericAPIView, ListCreateAPIView, DestroyAPIView, ListAPIView
 from rest_framework.response import Response
 from rest_framework import status
+from backend.replicas import pin_to_primary
 from .models import Bookmark, generate_bookmark_token
-from .serializers import BookmarkSerializer
+from .serializers import BookmarkBulkSerializer, BookmarkSerializer, BookmarkToggleSerializer
+from vehicles.models import Vehicle
+from vehicles.embedding import CompactEmbedMixin
+from vehicles.pagination import AsyncPageNumberPagination
+from vehicles.fieldsets import Fieldset, restrict_embedded_vehicle_queryset
+from vehicles.read_plans import get_read_plan
+from vehicles.serializers import VehicleSerializer
 
 
 class BookmarkListCreateView(ListCreateAPIView):
@@ -16,13 +25,21 @@ class BookmarkListCreateView(ListCreateAPIView):
         bookmark_token = self.request.query_params.get('token')
         if not bookmark_token:
             return Bookmark.objects.none()
-        return Bookmark.objects.filter(bookmark_token=bookmark_token).select_related('vehicle').order_by('-created_at')
+        return (
+            Bookmark.objects
+            .filter(bookmark_token=bookmark_token)
+            .select_related('vehicle')
+            .defer('vehicle__search_vector')
+            .order_by('-created_at')
+        )
     
     def create(self, request, *args, **kwargs):
         """
         Create a bookmark and return it with the bookmark_token.
         If bookmark_token is provided in request, use it (for grouping multiple bookmarks).
         Otherwise, generate a new token.
+        Bookmarking a vehicle that is already bookmarked under the token
+        returns the existing bookmark (200) instead of creating a duplicate.
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -31,27 +48,172 @@ class BookmarkListCreateView(ListCreateAPIView):
         bookmark_token = request.data.get('bookmark_token') or generate_bookmark_token()
         
         # Save with the token (either provided or generated)
-        bookmark = serializer.save(bookmark_token=bookmark_token)
+        bookmark, created = Bookmark.objects.get_or_create(
+            bookmark_token=bookmark_token,
+            vehicle=serializer.validated_data['vehicle'],
+        )
+        # Show it in this token's next MyBookmarksView reads
+        pin_to_primary(bookmark_token)
         
         # Return the bookmark with token
         response_serializer = BookmarkSerializer(bookmark)
-        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(
+            response_serializer.data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class BookmarkBulkView(GenericAPIView):
+    """
+    Add and/or remove many bookmarks of one token in a single request.
+    Body: {"bookmark_token": "...", "add": [vehicle ids], "remove": [vehicle ids]}
+    Adding an existing bookmark or removing a missing one is a no-op. Returns
+    the token and the ids of every vehicle bookmarked under it afterwards.
+    """
+    serializer_class = BookmarkBulkSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        bookmark_token = data.get('bookmark_token') or generate_bookmark_token()
+        add, remove = set(data.get('add', [])), set(data.get('remove', []))
+
+        if add:
+            missing = add - set(Vehicle.objects.filter(pk__in=add).values_list('pk', flat=True))
+            if missing:
+                raise ValidationError({
+                    'add': [f'Invalid pk "{pk}" - object does not exist.' for pk in sorted(missing)]
+                })
+
+        with transaction.atomic():
+            if add:
+                # INSERT ... ON CONFLICT DO NOTHING against bookmark_token_vehicle_uniq
+                Bookmark.objects.bulk_create(
+                    [Bookmark(bookmark_token=bookmark_token, vehicle_id=pk) for pk in sorted(add)],
+                    ignore_conflicts=True,
+                )
+            if remove:
+                Bookmark.objects.filter(bookmark_token=bookmark_token, vehicle_id__in=remove).delete()
+        pin_to_primary(bookmark_token)
+
+        vehicles = (
+            Bookmark.objects
+            .filter(bookmark_token=bookmark_token)
+            .order_by('-created_at', '-id')
+            .values_list('vehicle_id', flat=True)
+        )
+        return Response({'bookmark_token': bookmark_token, 'vehicles': list(vehicles)})
+
+
+class BookmarkToggleView(GenericAPIView):
+    """
+    Flip the bookmark of one vehicle for a token.
+    Body: {"vehicle": 1, "bookmark_token": "optional-existing-token"}
+    Returns the resulting state: {"bookmark_token": ..., "vehicle": 1, "bookmarked": true}
+    """
+    serializer_class = BookmarkToggleSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        vehicle = serializer.validated_data['vehicle']
+        bookmark_token = request.data.get('bookmark_token') or generate_bookmark_token()
+
+        with transaction.atomic():
+            deleted, _ = Bookmark.objects.filter(bookmark_token=bookmark_token, vehicle=vehicle).delete()
+            if not deleted:
+                # A concurrent toggle may have added it already; both end up bookmarked
+                Bookmark.objects.bulk_create(
+                    [Bookmark(bookmark_token=bookmark_token, vehicle=vehicle)], ignore_conflicts=True
+                )
+        pin_to_primary(bookmark_token)
+
+        return Response({'bookmark_token': bookmark_token, 'vehicle': vehicle.pk, 'bookmarked': not deleted})
 
 
 class BookmarkDeleteView(DestroyAPIView):
     queryset = Bookmark.objects.all()
     serializer_class = BookmarkSerializer
 
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        pin_to_primary(instance.bookmark_token)
 
-class MyBookmarksView(ListAPIView):
+
+class MyBookmarksView(CompactEmbedMixin, ListAPIView):
     """
     List bookmarks for a specific bookmark token.
     Token should be provided as query parameter: ?token=<bookmark_token>
+    With ?embed=compact, vehicles are returned once in included.vehicles.
     """
     serializer_class = BookmarkSerializer
+    pagination_class = AsyncPageNumberPagination
     
     def get_queryset(self):
         bookmark_token = self.request.query_params.get('token')
         if not bookmark_token:
             return Bookmark.objects.none()
-        return Bookmark.objects.filter(bookmark_token=bookmark_token).select_related('vehicle').order_by('-created_at')
+        queryset = Bookmark.objects.filter(bookmark_token=bookmark_token).order_by('-created_at')
+
+        fields = self.get_rendered_fields()
+        if fields is not None:
+            return restrict_embedded_vehicle_queryset(queryset, *fields)
+        return queryset.select_related('vehicle').defer('vehicle__search_vector')
+
+    def get_rendered_fields(self):
+        """
+        (bookmark fields, vehicle fields) selected with ?fields=/?omit=,
+        or None when the full representation was requested.
+        """
+        fieldset = Fieldset.from_request(self.request)
+        if not fieldset.is_restricted:
+            return None
+        return (
+            fieldset.select(BookmarkSerializer.get_renderable_fields()),
+            fieldset.nested('vehicle').select(VehicleSerializer.get_renderable_fields()),
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_rendered_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields[0])
+            kwargs.setdefault('vehicle_fields', fields[1])
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        bookmark_fields, vehicle_fields = self.get_rendered_fields() or (None, None)
+        if self.is_compact_embed():
+            return self.list_compact(bookmark_fields, vehicle_fields)
+
+        # Serialize JSON responses straight from values_list() rows, with the
+        # vehicle columns fetched through the join in the same query
+        if request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+
+        plan, queryset = self.get_planned_queryset(bookmark_fields, vehicle_fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.serialize(page))
+        return Response(plan.serialize(queryset))
+
+    async def alist(self, request, *args, **kwargs):
+        """JSON list() with the async ORM, for the ASGI read path"""
+        bookmark_fields, vehicle_fields = self.get_rendered_fields() or (None, None)
+        if self.is_compact_embed():
+            return await self.alist_compact(bookmark_fields, vehicle_fields)
+
+        plan, queryset = self.get_planned_queryset(bookmark_fields, vehicle_fields)
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.serialize(page))
+        return Response(plan.serialize([row async for row in queryset]))
+
+    def get_planned_queryset(self, bookmark_fields, vehicle_fields):
+        """(read plan, values_list() queryset) rendering each bookmark with its vehicle"""
+        plan = get_read_plan(
+            BookmarkSerializer,
+            None if bookmark_fields is None else tuple(bookmark_fields),
+            (('vehicle', VehicleSerializer, None if vehicle_fields is None else tuple(vehicle_fields)),),
+        )
+        return plan, plan.values(self.filter_queryset(self.get_queryset()))
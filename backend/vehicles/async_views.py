@@ -0,0 +1,79 @@
+"""
+Async versions of the read-heavy catalog and token lookup endpoints, routed
+by backend.urls_async when the project is served over ASGI.
+
+JSON GET requests are answered by the views' async handlers (alist,
+aretrieve, ...), which query with the async ORM, so a worker's event loop
+keeps serving other connections while a request waits on the database.
+Everything else (writes, the browsable API, unacceptable Accept headers)
+falls through to the regular synchronous view, which Django runs in a
+thread.
+"""
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from bookings.views import MyBookingsView
+from bookmarks.views import MyBookmarksView
+from . import views
+from .cache import acache_catalog_response
+from .summary import build_vehicle_summary, vehicle_summary_rows
+
+
+def as_async_view(sync_view, handler):
+    """
+    Async view running `handler(view, request, *args, **kwargs)` for JSON GET
+    requests, and `sync_view` (a DRF view function) for all other requests.
+
+    The handler gets a view instance set up as APIView.dispatch() would,
+    and its response or API exception is finalized and rendered the same
+    way, so both paths produce identical responses. Authentication is not
+    run: it may query the session store synchronously, and these endpoints
+    are public and read-only. (The session is never read, so the response
+    doesn't vary on Cookie.)
+    """
+    view_class = sync_view.cls
+    fallback = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await fallback(request, *args, **kwargs)
+
+        self = view_class(**sync_view.initkwargs)
+        self.setup(request, *args, **kwargs)
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            self.format_kwarg = self.get_format_suffix(**kwargs)
+            request.accepted_renderer, request.accepted_media_type = self.perform_content_negotiation(request)
+        except APIException:
+            return await fallback(request._request, *args, **kwargs)
+        if request.accepted_renderer.format != 'json':
+            return await fallback(request._request, *args, **kwargs)
+
+        try:
+            self.check_permissions(request)
+            response = await handler(self, request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        response = self.finalize_response(request, response, *args, **kwargs)
+        return response.render()
+
+    return csrf_exempt(view)
+
+
+async def avehicle_summary(view, request):
+    return Response(build_vehicle_summary([row async for row in vehicle_summary_rows()]))
+
+
+vehicle_list = acache_catalog_response(
+    as_async_view(views.VehicleListCreateView.as_view(), views.VehicleListCreateView.alist)
+)
+vehicle_detail = acache_catalog_response(
+    as_async_view(views.VehicleDetailView.as_view(), views.VehicleDetailView.aretrieve)
+)
+vehicle_summary = acache_catalog_response(as_async_view(views.vehicle_summary, avehicle_summary))
+my_bookings = as_async_view(MyBookingsView.as_view(), MyBookingsView.alist)
+my_bookmarks = as_async_view(MyBookmarksView.as_view(), MyBookmarksView.alist)
@@ -0,0 +1,175 @@
+import heapq
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .cache import get_catalog_version
+from .models import Vehicle
+
+
+class PrefixTrie:
+    """
+    Case-insensitive prefix trie over suggestion labels.
+
+    Every node down to `depth` characters stores its top `limit` suggestions
+    by weight, precomputed at build time, so a lookup is a walk of at most
+    `depth` nodes with no sorting. Longer prefixes are not indexed and return
+    None; callers fall back to the database for them.
+
+    `complete` is False when the trie was built from only the heaviest terms.
+    A prefix with fewer than `limit` suggestions then returns None too, since
+    the terms left out may match it.
+    """
+
+    def __init__(self, depth, limit, complete=True):
+        self.depth = depth
+        self.limit = limit
+        self.complete = complete
+        self.root = {}
+        self.top = {}
+
+    @classmethod
+    def build(cls, suggestions, depth, limit, complete=True):
+        """Build from (suggestion, weight, labels) triples"""
+        trie = cls(depth, limit, complete)
+        candidates = {}
+        for index, (suggestion, weight, labels) in enumerate(suggestions):
+            prefixes = set()
+            for label in labels:
+                label = label.lower()
+                prefixes.update(label[:length] for length in range(1, min(len(label), depth) + 1))
+            # index breaks ties so suggestions never get compared directly
+            for prefix in prefixes:
+                candidates.setdefault(prefix, []).append((weight, -index, suggestion))
+
+        for prefix, entries in candidates.items():
+            trie.top[prefix] = [entry[2] for entry in heapq.nlargest(limit, entries)]
+        return trie
+
+    def lookup(self, prefix, limit):
+        prefix = prefix.lower()
+        if len(prefix) > self.depth or limit > self.limit:
+            return None
+        suggestions = self.top.get(prefix, [])
+        if len(suggestions) < limit and not self.complete:
+            return None
+        return suggestions[:limit]
+
+
+_trie_lock = threading.Lock()
+_trie_state = {'version': None, 'trie': None, 'checked': 0.0}
+
+
+def _load_suggestions():
+    """
+    Brand and model suggestions weighted by how many vehicles they cover, at
+    most AUTOCOMPLETE_TRIE_MAX_TERMS of each. Returns (suggestions, complete),
+    complete being False if any were left out.
+    """
+    max_terms = settings.AUTOCOMPLETE_TRIE_MAX_TERMS
+    # One extra row tells whether the terms were cut off
+    brands = list(
+        Vehicle.objects
+        .values('brand')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'brand')[:max_terms + 1]
+    )
+    models = list(
+        Vehicle.objects
+        .values('brand', 'name')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'brand', 'name')[:max_terms + 1]
+    )
+    complete = len(brands) <= max_terms and len(models) <= max_terms
+
+    suggestions = []
+    for row in brands[:max_terms]:
+        suggestion = {'type': 'brand', 'value': row['brand'], 'count': row['count']}
+        suggestions.append((suggestion, row['count'], (row['brand'],)))
+    for row in models[:max_terms]:
+        suggestion = {'type': 'model', 'brand': row['brand'], 'value': row['name'], 'count': row['count']}
+        labels = (row['name'], f"{row['brand']} {row['name']}")
+        suggestions.append((suggestion, row['count'], labels))
+    return suggestions, complete
+
+
+def get_prefix_trie():
+    """
+    The in-process trie for the current catalog version, rebuilt lazily after
+    the catalog changes. The version is checked at most every
+    AUTOCOMPLETE_TRIE_CHECK_SECONDS, so hot prefixes are answered without a
+    cache or database round trip. Returns None while another thread is
+    rebuilding it, so requests never queue behind a rebuild.
+    """
+    now = time.monotonic()
+    if _trie_state['trie'] is not None and now - _trie_state['checked'] < settings.AUTOCOMPLETE_TRIE_CHECK_SECONDS:
+        return _trie_state['trie']
+
+    version = get_catalog_version()
+    if _trie_state['version'] == version:
+        _trie_state['checked'] = now
+        return _trie_state['trie']
+
+    if not _trie_lock.acquire(blocking=False):
+        return None
+    try:
+        if _trie_state['version'] != version:
+            suggestions, complete = _load_suggestions()
+            trie = PrefixTrie.build(
+                suggestions,
+                depth=settings.AUTOCOMPLETE_TRIE_DEPTH,
+                limit=settings.AUTOCOMPLETE_MAX_LIMIT,
+                complete=complete,
+            )
+            _trie_state.update(version=version, trie=trie, checked=now)
+        return _trie_state['trie']
+    finally:
+        _trie_lock.release()
+
+
+def query_suggestions(prefix, limit):
+    """
+    Database lookup for prefixes the trie doesn't cover. The istartswith
+    lookups compile to UPPER(column) LIKE UPPER('prefix%'), which the
+    gin_trgm_ops expression indexes on brand and name serve.
+    """
+    brands = (
+        Vehicle.objects
+        .filter(brand__istartswith=prefix)
+        .values('brand')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'brand')[:limit]
+    )
+
+    model_filter = Q(name__istartswith=prefix)
+    head, _, tail = prefix.partition(' ')
+    if tail:
+        # "toyota ca" -> Toyota models starting with "ca"
+        model_filter |= Q(brand__iexact=head, name__istartswith=tail)
+    models = (
+        Vehicle.objects
+        .filter(model_filter)
+        .values('brand', 'name')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'brand', 'name')[:limit]
+    )
+
+    suggestions = [{'type': 'brand', 'value': row['brand'], 'count': row['count']} for row in brands]
+    suggestions += [
+        {'type': 'model', 'brand': row['brand'], 'value': row['name'], 'count': row['count']}
+        for row in models
+    ]
+    # Same order as the trie: by weight, brands before models on ties
+    suggestions.sort(key=lambda suggestion: -suggestion['count'])
+    return suggestions[:limit]
+
+
+def get_suggestions(prefix, limit):
+    trie = get_prefix_trie()
+    if trie is not None:
+        suggestions = trie.lookup(prefix, limit)
+        if suggestions is not None:
+            return suggestions
+    return query_suggestions(prefix, limit)
@@ -0,0 +1,234 @@
+import hashlib
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from backend.replicas import CATALOG_PIN, pin_to_primary
+
+from .filters import filter_signature
+from .models import CatalogVersion
+
+
+def _version_key(alias):
+    return f'vehicles:catalog_version:{alias}'
+
+
+def get_catalog_version():
+    """
+    Current catalog version. Every transaction that writes the vehicles table
+    bumps it in the database (see CatalogVersion), so cache entries keyed on
+    it are invalidated in every process without having to find and delete
+    them.
+
+    The version is cached for CATALOG_VERSION_CACHE_TIMEOUT seconds, so
+    cached responses are served without touching the database. It is read
+    and cached per database the router picks: a replica reports the version
+    of the rows it holds, so responses it fills are never cached under a
+    newer version.
+    """
+    alias = router.db_for_read(CatalogVersion)
+    key = _version_key(alias)
+    version = cache.get(key)
+    if version is None:
+        # The row is only missing after a flush, until the next catalog write
+        version = CatalogVersion.objects.using(alias).filter(pk=CatalogVersion.ROW_ID).values_list(
+            'version', flat=True
+        ).first() or 0
+        cache.set(key, version, settings.CATALOG_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+async def aget_catalog_version():
+    """Async get_catalog_version()"""
+    alias = router.db_for_read(CatalogVersion)
+    key = _version_key(alias)
+    version = await cache.aget(key)
+    if version is None:
+        version = await CatalogVersion.objects.using(alias).filter(pk=CatalogVersion.ROW_ID).values_list(
+            'version', flat=True
+        ).afirst() or 0
+        await cache.aset(key, version, settings.CATALOG_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def expire_catalog_version():
+    """Drop the cached catalog version, so the next request reads it from the database"""
+    cache.delete_many([_version_key(alias) for alias in settings.DATABASES])
+
+
+def catalog_changed():
+    """
+    Call after writing the catalog. The database bumps the version when the
+    transaction commits; this drops the cached copy at that point, rather
+    than after CATALOG_VERSION_CACHE_TIMEOUT, and keeps reads on the primary
+    until replicas catch up, so the writer sees its change.
+    """
+    pin_to_primary(CATALOG_PIN)
+    transaction.on_commit(expire_catalog_version)
+
+
+def estimate_count(queryset):
+    """Row estimate from the Postgres planner, without executing the query"""
+    # Run EXPLAIN directly: QuerySet.explain() reformats the plan, and its
+    # output shape differs between database drivers
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    plan = plan[0] if isinstance(plan, list) else plan
+    return int(plan['Plan']['Plan Rows'])
+
+
+def _count_key(version, params, estimate):
+    mode = 'estimate' if estimate else 'exact'
+    return f'vehicles:count:{version}:{mode}:{filter_signature(params)}'
+
+
+def get_vehicle_count(queryset, params, estimate=False):
+    """
+    Total rows for a filtered vehicle list, cached per catalog version and
+    normalized filter signature.
+
+    With estimate=True the planner's row estimate is returned instead of an
+    exact COUNT(*) when it is above VEHICLE_COUNT_ESTIMATE_THRESHOLD. Smaller
+    result sets are still counted exactly, since counting them is cheap.
+    Returns (count, is_estimate).
+    """
+    key = _count_key(get_catalog_version(), params, estimate)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = None
+    if estimate:
+        rows = estimate_count(queryset)
+        if rows >= settings.VEHICLE_COUNT_ESTIMATE_THRESHOLD:
+            result = (rows, True)
+    if result is None:
+        result = (queryset.count(), False)
+
+    cache.set(key, result, settings.VEHICLE_COUNT_CACHE_TIMEOUT)
+    return result
+
+
+async def aget_vehicle_count(queryset, params, estimate=False):
+    """Async get_vehicle_count()"""
+    key = _count_key(await aget_catalog_version(), params, estimate)
+    cached = await cache.aget(key)
+    if cached is not None:
+        return cached
+
+    result = None
+    if estimate:
+        # explain() has no async variant
+        rows = await sync_to_async(estimate_count)(queryset)
+        if rows >= settings.VEHICLE_COUNT_ESTIMATE_THRESHOLD:
+            result = (rows, True)
+    if result is None:
+        result = (await queryset.acount(), False)
+
+    await cache.aset(key, result, settings.VEHICLE_COUNT_CACHE_TIMEOUT)
+    return result
+
+
+def _request_digest(request):
+    # The Accept header picks the renderer (JSON vs. browsable API), and the
+    # absolute URI covers the host used in pagination links.
+    raw = f'{request.build_absolute_uri()}|{request.META.get("HTTP_ACCEPT", "")}'
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _catalog_cache_keys(request, version):
+    """(cache key, ETag) of a catalog GET request"""
+    digest = _request_digest(request)
+    return f'vehicles:response:{version}:{digest}', f'"{version}-{digest[:16]}"'
+
+
+def _not_modified(etag):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    return response
+
+
+def _cached_response(cached):
+    content, headers = cached
+    response = HttpResponse(content)
+    for header, value in headers:
+        response[header] = value
+    return response
+
+
+def _is_cacheable(response):
+    return response.status_code == 200 and response.get('Content-Type') == 'application/json'
+
+
+def cache_catalog_response(view_func):
+    """
+    Cache rendered JSON GET responses of a catalog view against the catalog
+    version, and answer If-None-Match with 304 Not Modified.
+
+    The ETag is derived from the catalog version and the request, so a
+    matching If-None-Match is answered before the cache or the database is
+    consulted. Any Vehicle write bumps the version, which changes every ETag
+    and orphans every cached body at once.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+
+        key, etag = _catalog_cache_keys(request, get_catalog_version())
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return _not_modified(etag)
+
+        cached = cache.get(key)
+        if cached is not None:
+            return _cached_response(cached)
+
+        response = view_func(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        if not _is_cacheable(response):
+            return response
+
+        patch_vary_headers(response, ('Accept',))
+        response['ETag'] = etag
+        cache.set(key, (response.content, list(response.items())), settings.CATALOG_RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
+
+
+def acache_catalog_response(view_func):
+    """cache_catalog_response() for async views, sharing the same cache entries"""
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await view_func(request, *args, **kwargs)
+
+        key, etag = _catalog_cache_keys(request, await aget_catalog_version())
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return _not_modified(etag)
+
+        cached = await cache.aget(key)
+        if cached is not None:
+            return _cached_response(cached)
+
+        response = await view_func(request, *args, **kwargs)
+        if not _is_cacheable(response):
+            return response
+
+        patch_vary_headers(response, ('Accept',))
+        response['ETag'] = etag
+        await cache.aset(key, (response.content, list(response.items())), settings.CATALOG_RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
@@ -0,0 +1,62 @@
+"""
+Bulk vehicle deletion without Django's delete collector.
+
+QuerySet.delete() loads every vehicle into memory to emulate ON DELETE
+CASCADE and send post_delete, which on a large catalog takes minutes and
+gigabytes. These helpers delete in SQL instead: TRUNCATE for a full wipe,
+and keyset-batched DELETEs, related rows first, for everything else.
+Neither sends model signals, so callers call catalog_changed() once
+they're done.
+"""
+from django.db import connections, transaction
+
+from .models import Vehicle
+
+
+def related_tables():
+    """(table, column) of every foreign key to Vehicle, e.g. bookings and bookmarks"""
+    return [(rel.related_model._meta.db_table, rel.field.column) for rel in Vehicle._meta.related_objects]
+
+
+def truncate_vehicles(lock_timeout='5s', using='default'):
+    """
+    Empty the vehicles table and every table referencing it in one
+    TRUNCATE ... CASCADE. TRUNCATE needs an exclusive lock, which it holds
+    only for an instant, but waiting for it would queue every API query
+    behind it, so it gives up after `lock_timeout` instead.
+    """
+    connection = connections[using]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute('SET LOCAL lock_timeout = %s', [lock_timeout])
+        cursor.execute(f'TRUNCATE {connection.ops.quote_name(Vehicle._meta.db_table)} CASCADE')
+
+
+def delete_vehicles(queryset, batch_size=5000, progress=None, using='default'):
+    """
+    Delete the vehicles selected by `queryset`, with the rows referencing
+    them, in batches of `batch_size` ids read by keyset (id > last id of the
+    previous batch, so each lookup starts where the last one ended). Each
+    batch is a short transaction of its own, so row locks are only held
+    briefly. `progress(vehicles, related)` is called after every batch with
+    the running totals. Returns (vehicles, {table: rows}) deleted.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    tables = related_tables()
+    queryset = queryset.using(using).order_by('pk').values_list('pk', flat=True)
+    deleted, related = 0, {table: 0 for table, _ in tables}
+    last_id = 0
+
+    while ids := list(queryset.filter(pk__gt=last_id)[:batch_size]):
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            for table, column in tables:
+                cursor.execute(f'DELETE FROM {quote(table)} WHERE {quote(column)} = ANY(%s)', [ids])
+                related[table] += cursor.rowcount
+            cursor.execute(
+                f'DELETE FROM {quote(Vehicle._meta.db_table)} WHERE {quote(Vehicle._meta.pk.column)} = ANY(%s)', [ids]
+            )
+            deleted += cursor.rowcount
+        last_id = ids[-1]
+        if progress is not None:
+            progress(deleted, related)
+    return deleted, related
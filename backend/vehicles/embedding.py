@@ -0,0 +1,72 @@
+from rest_framework.response import Response
+
+from .models import Vehicle
+from .pagination import AsyncPaginationMixin
+from .read_plans import get_read_plan
+from .serializers import VehicleSerializer
+
+
+def get_included_vehicles(ids, fields=None):
+    """
+    Serialize each of the given vehicles once, keyed by id, with a single
+    IN query. `fields` limits the rendered vehicle fields (None for all).
+    """
+    if not ids:
+        return {}
+    plan = get_read_plan(VehicleSerializer, None if fields is None else tuple(fields))
+    rows = list(plan.values(Vehicle.objects.filter(pk__in=ids).order_by('id')))
+    return {str(row.id): data for row, data in zip(rows, plan.serialize(rows))}
+
+
+async def aget_included_vehicles(ids, fields=None):
+    """Async get_included_vehicles()"""
+    if not ids:
+        return {}
+    plan = get_read_plan(VehicleSerializer, None if fields is None else tuple(fields))
+    rows = [row async for row in plan.values(Vehicle.objects.filter(pk__in=ids).order_by('id'))]
+    return {str(row.id): data for row, data in zip(rows, plan.serialize(rows))}
+
+
+class CompactEmbedMixin(AsyncPaginationMixin):
+    """
+    List view mixin for rows that embed their vehicle (bookings, bookmarks).
+
+    With ?embed=compact each row carries only the vehicle id, and every
+    distinct vehicle on the page is serialized once into `included.vehicles`
+    instead of being repeated in every row that references it.
+    """
+    embed_query_param = 'embed'
+
+    def is_compact_embed(self):
+        return self.request.query_params.get(self.embed_query_param) == 'compact'
+
+    def list_compact(self, fields=None, vehicle_fields=None):
+        plan = get_read_plan(self.get_serializer_class(), None if fields is None else tuple(fields))
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        data = plan.serialize(queryset if page is None else page)
+        ids = {row['vehicle'] for row in data if 'vehicle' in row}
+        included = {'vehicles': get_included_vehicles(ids, vehicle_fields)}
+
+        if page is None:
+            return Response({'results': data, 'included': included})
+        response = self.get_paginated_response(data)
+        response.data['included'] = included
+        return response
+
+    async def alist_compact(self, fields=None, vehicle_fields=None):
+        """Async list_compact()"""
+        plan = get_read_plan(self.get_serializer_class(), None if fields is None else tuple(fields))
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+
+        page = await self.apaginate_queryset(queryset)
+        data = plan.serialize([row async for row in queryset] if page is None else page)
+        ids = {row['vehicle'] for row in data if 'vehicle' in row}
+        included = {'vehicles': await aget_included_vehicles(ids, vehicle_fields)}
+
+        if page is None:
+            return Response({'results': data, 'included': included})
+        response = self.get_paginated_response(data)
+        response.data['included'] = included
+        return response
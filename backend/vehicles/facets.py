@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.db import connections, router
+
+from .filters import SEARCH_CONFIG, get_vehicle_filters
+from .models import Vehicle
+
+
+def get_vehicle_facets(params):
+    """
+    Brand counts, fuel_type counts and a price histogram for the vehicle list
+    filters, computed in a single GROUPING SETS query.
+
+    Each facet ignores its own filter (the brand counts apply the fuel and
+    price filters but not the brand one, and so on), so the UI can show the
+    alternatives to the current selection. Every row of the scan carries one
+    boolean per filter, and each facet counts with FILTER (WHERE ...) over
+    the other two.
+    """
+    filters = get_vehicle_filters(params)
+    thresholds = list(settings.VEHICLE_PRICE_BUCKETS)
+
+    brand_sql, brand_params = ('brand = %s', [filters['brand']]) if 'brand' in filters else ('TRUE', [])
+    fuel_sql, fuel_params = ('fuel_type = %s', [filters['fuel_type']]) if 'fuel_type' in filters else ('TRUE', [])
+    price_parts, price_params = [], []
+    if 'min_price' in filters:
+        price_parts.append('price >= %s')
+        price_params.append(filters['min_price'])
+    if 'max_price' in filters:
+        price_parts.append('price <= %s')
+        price_params.append(filters['max_price'])
+    price_sql = ' AND '.join(price_parts) or 'TRUE'
+    # ?q= narrows every facet alike
+    search_sql, search_params = (
+        (f"search_vector @@ websearch_to_tsquery('{SEARCH_CONFIG}', %s)", [filters['q']])
+        if 'q' in filters else ('TRUE', [])
+    )
+
+    # Only rows that pass at least two of the three filters can count towards
+    # any facet; the brand/fuel equality predicates let Postgres use
+    # vehicle_brand_fuel_idx (and the fuel_type index) to find them.
+    sql = f"""
+        SELECT
+            GROUPING(brand), GROUPING(fuel_type), GROUPING(bucket),
+            brand, fuel_type, bucket,
+            count(*) FILTER (WHERE fuel_ok AND price_ok),
+            count(*) FILTER (WHERE brand_ok AND price_ok),
+            count(*) FILTER (WHERE brand_ok AND fuel_ok),
+            count(*) FILTER (WHERE brand_ok AND fuel_ok AND price_ok),
+            min(price) FILTER (WHERE brand_ok AND fuel_ok),
+            max(price) FILTER (WHERE brand_ok AND fuel_ok)
+        FROM (
+            SELECT
+                brand, fuel_type, price,
+                width_bucket(price, %s::integer[]) AS bucket,
+                ({brand_sql}) AS brand_ok,
+                ({fuel_sql}) AS fuel_ok,
+                ({price_sql}) AS price_ok
+            FROM {Vehicle._meta.db_table}
+            WHERE ({search_sql}) AND (
+                (({fuel_sql}) AND ({price_sql}))
+                OR (({brand_sql}) AND ({price_sql}))
+                OR (({brand_sql}) AND ({fuel_sql}))
+            )
+        ) AS v
+        GROUP BY GROUPING SETS ((brand), (fuel_type), (bucket), ())
+    """
+    sql_params = (
+        [thresholds] + brand_params + fuel_params + price_params
+        + search_params
+        + fuel_params + price_params
+        + brand_params + price_params
+        + brand_params + fuel_params
+    )
+
+    # Raw SQL skips the router; ask it, so facets are read from the request's
+    # replica like every other catalog query
+    with connections[router.db_for_read(Vehicle)].cursor() as cursor:
+        cursor.execute(sql, sql_params)
+        rows = cursor.fetchall()
+
+    facets = {
+        'total': 0,
+        'brands': [],
+        'fuel_types': [],
+        'price': {'min': None, 'max': None, 'buckets': []},
+    }
+    bucket_counts = {}
+    for (g_brand, g_fuel, g_bucket, brand, fuel_type, bucket,
+         brand_count, fuel_count, price_count, total, min_price, max_price) in rows:
+        if not g_brand:
+            if brand_count:
+                facets['brands'].append({'value': brand, 'count': brand_count})
+        elif not g_fuel:
+            if fuel_count:
+                facets['fuel_types'].append({'value': fuel_type, 'count': fuel_count})
+        elif not g_bucket:
+            bucket_counts[bucket] = price_count
+        else:
+            facets['total'] = total
+            facets['price']['min'] = min_price
+            facets['price']['max'] = max_price
+
+    facets['brands'].sort(key=lambda item: item['value'])
+    facets['fuel_types'].sort(key=lambda item: item['value'])
+
+    # width_bucket() numbers the range [thresholds[i - 1], thresholds[i]) as
+    # bucket i; prices at or above the last threshold land in the open-ended
+    # final bucket.
+    bounds = [None] + thresholds + [None]
+    for index in range(1, len(bounds) - 1):
+        facets['price']['buckets'].append({
+            'min': bounds[index],
+            'max': bounds[index + 1],
+            'count': bucket_counts.get(index, 0),
+        })
+    return facets
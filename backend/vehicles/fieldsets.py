@@ -0,0 +1,68 @@
+class Fieldset:
+    """
+    Field selection parsed from ?fields=a,b and ?omit=c,d.
+
+    Dotted names address a nested object, e.g. ?fields=id,vehicle.brand
+    renders the booking id and only the brand of its vehicle, and
+    ?omit=vehicle.description drops one nested field. Naming the nested object
+    itself (?fields=vehicle) selects all of its fields.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    def __init__(self, include=None, exclude=()):
+        self.include = set(include) if include else None
+        self.exclude = set(exclude)
+
+    @classmethod
+    def from_request(cls, request):
+        # DRF request or plain Django HttpRequest
+        params = getattr(request, 'query_params', request.GET)
+        return cls(
+            include=cls.parse(params.get(cls.fields_query_param)),
+            exclude=cls.parse(params.get(cls.omit_query_param)),
+        )
+
+    @staticmethod
+    def parse(value):
+        return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+    @property
+    def is_restricted(self):
+        return self.include is not None or bool(self.exclude)
+
+    def select(self, available):
+        """The names from `available` to render, in their original order"""
+        selected = []
+        for name in available:
+            if name in self.exclude:
+                continue
+            if self.include is not None and not any(
+                requested == name or requested.startswith(f'{name}.') for requested in self.include
+            ):
+                continue
+            selected.append(name)
+        return selected
+
+    def nested(self, name):
+        """The selection for fields of the nested object `name`"""
+        prefix = f'{name}.'
+        include = None
+        if self.include is not None and name not in self.include:
+            include = {field[len(prefix):] for field in self.include if field.startswith(prefix)}
+        exclude = {field[len(prefix):] for field in self.exclude if field.startswith(prefix)}
+        return Fieldset(include, exclude)
+
+
+def restrict_embedded_vehicle_queryset(queryset, fields, vehicle_fields):
+    """
+    Limit a Booking/Bookmark queryset to the columns a sparse response needs:
+    the selected row fields and, when the vehicle is embedded, the selected
+    vehicle fields through select_related. Field names are serializer field
+    names, which match the model field names.
+    """
+    only = [name for name in fields if name != 'vehicle']
+    if 'vehicle' in fields:
+        queryset = queryset.select_related('vehicle')
+        only += ['vehicle'] + [f'vehicle__{name}' for name in vehicle_fields]
+    return queryset.only(*only)
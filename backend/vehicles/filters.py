@@ -0,0 +1,66 @@
+import hashlib
+import json
+
+from django.contrib.postgres.search import SearchQuery
+
+
+# Text search configuration shared by the search_vector trigger and queries
+SEARCH_CONFIG = 'english'
+
+
+def parse_price(value):
+    """Parse a price query param, returning None for missing or invalid values"""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None  # Ignore invalid price values
+
+
+def get_search_query(text):
+    """Parse ?q= with web-search syntax ("quoted phrases", or, -exclusions)"""
+    return SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+
+
+def get_vehicle_filters(params):
+    """
+    Normalize the vehicle list query params into a dict of active filters.
+
+    Missing, empty and invalid values are dropped, so requests that filter the
+    same rows produce the same dict regardless of how the params were spelled.
+    """
+    filters = {
+        'q': ' '.join((params.get('q') or '').split()) or None,
+        'brand': params.get('brand') or None,
+        'fuel_type': params.get('fuel_type') or None,
+        'min_price': parse_price(params.get('min_price')),
+        'max_price': parse_price(params.get('max_price')),
+    }
+    return {key: value for key, value in filters.items() if value is not None}
+
+
+def filter_vehicles(qs, params):
+    """Apply the q/brand/fuel_type/min_price/max_price query params to a Vehicle queryset"""
+    filters = get_vehicle_filters(params)
+
+    if 'q' in filters:
+        # Matches with @@ against the GIN-indexed search_vector column
+        qs = qs.filter(search_vector=get_search_query(filters['q']))
+    if 'brand' in filters:
+        qs = qs.filter(brand=filters['brand'])
+    if 'fuel_type' in filters:
+        qs = qs.filter(fuel_type=filters['fuel_type'])
+    if 'min_price' in filters:
+        qs = qs.filter(price__gte=filters['min_price'])
+    if 'max_price' in filters:
+        qs = qs.filter(price__lte=filters['max_price'])
+
+    return qs
+
+
+def filter_signature(params):
+    """Stable hash of the normalized filters, for use in cache keys"""
+    filters = get_vehicle_filters(params)
+    encoded = json.dumps(filters, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(encoded.encode()).hexdigest()
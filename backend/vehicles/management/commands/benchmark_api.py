@@ -0,0 +1,337 @@
+import csv
+import json
+import statistics
+import time
+from collections import namedtuple
+from datetime import date
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import get_resolver, resolve
+from bookings.models import Booking
+from bookmarks.models import Bookmark
+from vehicles.models import Vehicle
+
+
+# One benchmarked request. `path` and `body` may be callables taking
+# (iteration, context); `setup` runs untimed before each iteration and its
+# return value is passed to them as context['setup'].
+Scenario = namedtuple('Scenario', 'name method path body setup', defaults=(None, None))
+
+# Latency changes smaller than this are treated as noise
+LATENCY_NOISE_MS = 1.0
+
+
+def new_bookmark(context):
+    return Bookmark.objects.create(vehicle_id=context['vehicle_id'], bookmark_token='benchmark-delete').pk
+
+
+SCENARIOS = [
+    Scenario('vehicles.list', 'GET', '/api/vehicles'),
+    Scenario('vehicles.list.deep_page', 'GET', '/api/vehicles?page=50'),
+    Scenario('vehicles.list.filtered', 'GET', '/api/vehicles?brand=Toyota&fuel_type=Petrol&max_price=3000000'),
+    Scenario('vehicles.list.search', 'GET', '/api/vehicles?q=electric%20suv'),
+    Scenario('vehicles.list.cursor', 'GET', '/api/vehicles?pagination=cursor&ordering=price&page_size=20'),
+    Scenario('vehicles.list.sparse', 'GET', '/api/vehicles?fields=id,brand,name,price'),
+    Scenario('vehicles.create', 'POST', '/api/vehicles', lambda i, ctx: {
+        'brand': 'Benchmark', 'name': f'Model {ctx["run"]}-{i}', 'price': 1500000, 'fuel_type': 'Petrol',
+        'image_url': 'https://example.com/car.jpg', 'description': 'Benchmark vehicle.',
+    }),
+    Scenario('vehicles.detail', 'GET', lambda i, ctx: f'/api/vehicles/{ctx["vehicle_id"]}'),
+    Scenario('vehicles.summary', 'GET', '/api/vehicles/summary'),
+    Scenario('vehicles.facets', 'GET', '/api/vehicles/facets?fuel_type=Electric'),
+    Scenario('vehicles.autocomplete.short', 'GET', '/api/vehicles/autocomplete?prefix=to'),
+    Scenario('vehicles.export', 'GET', '/api/vehicles/export?brand=Toyota&format=csv'),
+    Scenario('vehicles.autocomplete.long', 'GET', '/api/vehicles/autocomplete?prefix=toyota%20inn'),
+    Scenario('bookmarks.list', 'GET', lambda i, ctx: f'/api/bookmarks?token={ctx["bookmark_token"]}'),
+    Scenario('bookmarks.create', 'POST', '/api/bookmarks', lambda i, ctx: {'vehicle': ctx['vehicle_id']}),
+    Scenario(
+        'bookmarks.delete', 'DELETE', lambda i, ctx: f'/api/bookmarks/{ctx["setup"]}', setup=new_bookmark,
+    ),
+    Scenario('bookmarks.my', 'GET', lambda i, ctx: f'/api/bookmarks/my?token={ctx["bookmark_token"]}'),
+    Scenario('bookmarks.bulk', 'POST', '/api/bookmarks/bulk', lambda i, ctx: {
+        'bookmark_token': f'benchmark-bulk-{i % 2}', 'add': ctx['vehicle_ids'][:20],
+    }),
+    Scenario('bookmarks.toggle', 'POST', '/api/bookmarks/toggle', lambda i, ctx: {
+        'vehicle': ctx['vehicle_id'], 'bookmark_token': 'benchmark-toggle',
+    }),
+    Scenario('bookings.create', 'POST', '/api/bookings', lambda i, ctx: {
+        'vehicle': ctx['vehicle_id'], 'customer_name': 'Bench Mark', 'customer_email': 'bench@example.com',
+    }),
+    Scenario('bookings.batch', 'POST', '/api/bookings/batch', lambda i, ctx: [
+        {'vehicle': vehicle_id, 'customer_name': 'Bench Mark', 'customer_email': 'bench@example.com'}
+        for vehicle_id in ctx['vehicle_ids'][:10]
+    ]),
+    Scenario('bookings.my', 'GET', lambda i, ctx: f'/api/bookings/my?token={ctx["booking_token"]}'),
+    Scenario('bookings.my.compact', 'GET', lambda i, ctx: f'/api/bookings/my?token={ctx["booking_token"]}&embed=compact'),
+    Scenario('bookings.export', 'GET', '/api/bookings/export?from=2025-12-01&to=2026-01-01&format=csv'),
+    Scenario('metrics', 'GET', '/metrics'),
+]
+
+
+class QueryCounter:
+    """execute_wrapper counting queries and rows returned by SELECTs"""
+
+    def __init__(self):
+        self.queries = self.rows = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        self.queries += 1
+        if sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            self.rows += max(context['cursor'].rowcount, 0)
+        return result
+
+
+def count_streamed_rows(content, content_type):
+    """
+    Records in a streamed NDJSON or CSV export body. Exports read through a
+    server-side cursor, whose rowcount QueryCounter can't see.
+    """
+    if content_type.startswith('text/csv'):
+        # Minus the header row
+        return max(sum(1 for _ in csv.reader(StringIO(content.decode()))) - 1, 0)
+    return content.count(b'\n')
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every API route with the test client against a seeded test database and '
+        'report latency percentiles, queries, rows and response size per endpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehicles', type=int, default=10000, help='Synthetic vehicles (default: 10000)')
+        parser.add_argument('--bookings', type=int, default=20000, help='Synthetic bookings (default: 20000)')
+        parser.add_argument('--bookmarks', type=int, default=20000, help='Synthetic bookmarks (default: 20000)')
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per endpoint (default: 50)')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per endpoint (default: 5)')
+        parser.add_argument('--only', help='Comma-separated scenario name prefixes to run')
+        parser.add_argument(
+            '--cache',
+            action='store_true',
+            help='Keep the configured cache (by default caching is disabled so every request does its full work)',
+        )
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the test database between runs')
+        parser.add_argument('--save', metavar='PATH', help='Write the results to a JSON baseline file')
+        parser.add_argument('--compare', metavar='PATH', help='Compare against a JSON baseline and fail on regressions')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.25,
+            help='Relative increase counted as a regression (default: 0.25)',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 2:
+            raise CommandError('--iterations must be at least 2.')
+        scenarios = self.select_scenarios(options['only'])
+        baseline = self.load_baseline(options)
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            self.seed(options)
+            cache_override = {} if options['cache'] else {
+                'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+            }
+            with override_settings(DEBUG=False, **cache_override):
+                last_ids = self.get_last_ids()
+                try:
+                    results = self.run_scenarios(scenarios, options)
+                finally:
+                    self.remove_created_rows(last_ids)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        self.print_results(results)
+        report = {
+            'data': {name: options[name] for name in ('vehicles', 'bookings', 'bookmarks')},
+            'cache': options['cache'],
+            'endpoints': results,
+        }
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f'Saved baseline to {options["save"]}.'))
+        if baseline is not None:
+            self.compare(baseline, report, options['threshold'])
+
+    def select_scenarios(self, only):
+        scenarios = SCENARIOS
+        if only:
+            prefixes = tuple(name.strip() for name in only.split(','))
+            scenarios = [scenario for scenario in SCENARIOS if scenario.name.startswith(prefixes)]
+            if not scenarios:
+                raise CommandError(f'No scenarios match --only={only}.')
+            return scenarios
+
+        # Every route should be benchmarked; point out the ones that aren't
+        covered = {resolve(self.static_path(scenario).split('?')[0]).route for scenario in SCENARIOS}
+        routes = {str(pattern.pattern) for pattern in get_resolver().url_patterns}
+        for route in sorted(routes - covered):
+            if not route.startswith('admin/'):
+                self.stdout.write(self.style.WARNING(f'No benchmark scenario for route: {route}'))
+        return scenarios
+
+    @staticmethod
+    def static_path(scenario):
+        """Scenario path with placeholder ids, for route matching"""
+        if callable(scenario.path):
+            return scenario.path(0, {
+                'vehicle_id': 1, 'setup': 1, 'booking_token': 'x', 'bookmark_token': 'x',
+            })
+        return scenario.path
+
+    def load_baseline(self, options):
+        if not options['compare']:
+            return None
+        try:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read baseline {options["compare"]}: {exc}')
+        sizes = {name: options[name] for name in ('vehicles', 'bookings', 'bookmarks')}
+        if baseline.get('data') != sizes or baseline.get('cache') != options['cache']:
+            raise CommandError(
+                f'Baseline was recorded with data={baseline.get("data")} cache={baseline.get("cache")}; '
+                f'run with the same --vehicles/--bookings/--bookmarks/--cache options.'
+            )
+        return baseline
+
+    def seed(self, options):
+        if options['keepdb'] and Vehicle.objects.count() >= options['vehicles']:
+            self.stdout.write('Reusing the seeded test database.')
+            return
+        self.stdout.write('Seeding the test database...')
+        call_command(
+            'seed_vehicles', synthetic=True, seed=1, as_of=date(2026, 1, 1),
+            vehicles=options['vehicles'], bookings=options['bookings'], bookmarks=options['bookmarks'],
+            stdout=StringIO(),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def get_last_ids(self):
+        return {
+            model: model.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            for model in (Bookmark, Booking, Vehicle)
+        }
+
+    def remove_created_rows(self, last_ids):
+        """
+        Delete what the write scenarios created so a reused (--keepdb)
+        database stays at the seeded state and runs remain comparable
+        """
+        for model, last_id in last_ids.items():
+            model.objects.filter(id__gt=last_id).delete()
+
+    def get_context(self):
+        """Ids and tokens the scenarios request, picked from the seeded data"""
+        vehicle_ids = list(Vehicle.objects.order_by('id').values_list('id', flat=True)[:20])
+        if not vehicle_ids:
+            raise CommandError('The test database has no vehicles.')
+        booking_token = (
+            Booking.objects.values_list('booking_token', flat=True)
+            .annotate(n=Count('id')).order_by('-n').first()
+        )
+        bookmark_token = (
+            Bookmark.objects.values_list('bookmark_token', flat=True)
+            .annotate(n=Count('id')).order_by('-n').first()
+        )
+        return {
+            'run': time.time_ns(),
+            'vehicle_id': vehicle_ids[0],
+            'vehicle_ids': vehicle_ids,
+            # The busiest tokens, i.e. the largest "my bookings" pages
+            'booking_token': booking_token or 'none',
+            'bookmark_token': bookmark_token or 'none',
+        }
+
+    def run_scenarios(self, scenarios, options):
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {settings.ADMIN_TOKEN}')
+        context = self.get_context()
+        results = {}
+
+        for scenario in scenarios:
+            samples = []
+            counter = QueryCounter()
+            for i in range(options['warmup'] + options['iterations']):
+                context['setup'] = scenario.setup(context) if scenario.setup else None
+                path = scenario.path(i, context) if callable(scenario.path) else scenario.path
+                body = scenario.body(i, context) if callable(scenario.body) else scenario.body
+                kwargs = {} if body is None else {'data': json.dumps(body), 'content_type': 'application/json'}
+
+                timed = i >= options['warmup']
+                if timed:
+                    counter.queries = counter.rows = 0
+                with connection.execute_wrapper(counter):
+                    start = time.perf_counter()
+                    response = client.generic(scenario.method, path, **kwargs)
+                    content = b''.join(response) if response.streaming else response.content
+                    elapsed = (time.perf_counter() - start) * 1000
+                rows = counter.rows
+                if response.streaming and response.status_code < 400:
+                    rows += count_streamed_rows(content, response['Content-Type'])
+                if timed:
+                    samples.append(elapsed)
+
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'{scenario.name}: {scenario.method} {path} returned {response.status_code}: '
+                    f'{content[:200]!r}'
+                )
+            percentiles = statistics.quantiles(samples, n=100, method='inclusive')
+            results[scenario.name] = {
+                'method': scenario.method,
+                'path': self.static_path(scenario),
+                'status': response.status_code,
+                'p50_ms': round(percentiles[49], 3),
+                'p95_ms': round(percentiles[94], 3),
+                'p99_ms': round(percentiles[98], 3),
+                # Per request, from the last iteration
+                'queries': counter.queries,
+                'rows': rows,
+                'bytes': len(content),
+            }
+        return results
+
+    def print_results(self, results):
+        header = f'{"endpoint":<30} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"queries":>8} {"rows":>8} {"bytes":>9}'
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<30} {result["p50_ms"]:>9.2f} {result["p95_ms"]:>9.2f} {result["p99_ms"]:>9.2f} '
+                f'{result["queries"]:>8} {result["rows"]:>8} {result["bytes"]:>9}'
+            )
+
+    def compare(self, baseline, report, threshold):
+        regressions = []
+        for name, current in report['endpoints'].items():
+            base = baseline['endpoints'].get(name)
+            if base is None:
+                continue
+            for metric in ('p50_ms', 'p95_ms'):
+                if (current[metric] > base[metric] * (1 + threshold)
+                        and current[metric] - base[metric] > LATENCY_NOISE_MS):
+                    regressions.append(f'{name}: {metric} {base[metric]:.2f} -> {current[metric]:.2f}')
+            # Query counts are deterministic, so any increase is a regression
+            if current['queries'] > base['queries']:
+                regressions.append(f'{name}: queries {base["queries"]} -> {current["queries"]}')
+            for metric in ('rows', 'bytes'):
+                if current[metric] > base[metric] * (1 + threshold):
+                    regressions.append(f'{name}: {metric} {base[metric]} -> {current[metric]}')
+
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            raise CommandError(f'{len(regressions)} regression(s) against the baseline.')
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from vehicles.models import Vehicle
+from vehicles.read_plans import get_read_plan
+from vehicles.renderers import ORJSONRenderer
+from vehicles.serializers import VehicleSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare ModelSerializer + JSONRenderer against the read plan + orjson '
+        'renderer on the vehicle list and report rows/sec'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Rows per run (default: 10000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per path; the best is reported (default: 5)')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        if rows < 1 or repeat < 1:
+            raise CommandError('--rows and --repeat must be positive.')
+
+        plan = get_read_plan(VehicleSerializer)
+        queryset = Vehicle.objects.order_by('-created_at', '-id')
+        instances = list(queryset)
+        if not instances:
+            raise CommandError('No vehicles to serialize. Run seed_vehicles first.')
+
+        # Database time is left out; repeat the fetched rows up to --rows so
+        # both paths serialize the same data
+        values = list(plan.values(queryset))
+        instances = (instances * (rows // len(instances) + 1))[:rows]
+        values = (values * (rows // len(values) + 1))[:rows]
+
+        def serializer_path():
+            return JSONRenderer().render(VehicleSerializer(instances, many=True).data)
+
+        def plan_path():
+            return ORJSONRenderer().render(plan.serialize(values))
+
+        if serializer_path() != plan_path():
+            raise CommandError('Read plan output differs from the ModelSerializer output.')
+
+        baseline = self.time_best(serializer_path, repeat)
+        fast = self.time_best(plan_path, repeat)
+
+        self.stdout.write(f'ModelSerializer + JSONRenderer: {rows / baseline:>12,.0f} rows/sec')
+        self.stdout.write(f'ReadPlan + ORJSONRenderer:      {rows / fast:>12,.0f} rows/sec')
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {baseline / fast:.1f}x (output is byte-identical)'))
+
+    @staticmethod
+    def time_best(func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -1,9 +1,26 @@
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+from vehicles.cache import catalog_changed
+from vehicles.deletion import delete_vehicles, truncate_vehicles
 from vehicles.models import Vehicle
 
 
+# SQLSTATE of a lock_timeout expiring
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+def related_names():
+    """{table: verbose plural name} of the models referencing Vehicle"""
+    return {
+        rel.related_model._meta.db_table: str(rel.related_model._meta.verbose_name_plural)
+        for rel in Vehicle._meta.related_objects
+    }
+
+
 class Command(BaseCommand):
-    help = 'Delete all vehicles from the database'
+    help = 'Delete all vehicles, or those of some brands, with their bookings and bookmarks'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -11,10 +28,25 @@ class Command(BaseCommand):
             action='store_true',
             help='Skip confirmation prompt',
         )
+        parser.add_argument(
+            '--brand',
+            action='append',
+            help='Only delete vehicles of this brand (repeatable); deletes in batches instead of truncating',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Vehicles deleted per transaction with --brand (default: 5000)',
+        )
 
     def handle(self, *args, **options):
-        vehicle_count = Vehicle.objects.count()
-        
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        brands = options['brand']
+        queryset = Vehicle.objects.filter(brand__in=brands) if brands else Vehicle.objects.all()
+        vehicle_count = queryset.count()
+
         if vehicle_count == 0:
             self.stdout.write(
                 self.style.WARNING('No vehicles found in the database.')
@@ -22,8 +54,9 @@ class Command(BaseCommand):
             return
 
         if not options['confirm']:
+            scope = f'{vehicle_count} {", ".join(brands)} vehicles' if brands else f'all {vehicle_count} vehicles'
             confirm = input(
-                f'Are you sure you want to delete all {vehicle_count} vehicles? (yes/no): '
+                f'Are you sure you want to delete {scope} and their bookings and bookmarks? (yes/no): '
             )
             if confirm.lower() != 'yes':
                 self.stdout.write(
@@ -31,10 +64,47 @@ class Command(BaseCommand):
                 )
                 return
 
-        deleted_count, _ = Vehicle.objects.all().delete()
-        
+        start = time.perf_counter()
+        if brands:
+            deleted_count = self.delete_batched(queryset, vehicle_count, options['batch_size'])
+        else:
+            deleted_count = self.truncate(vehicle_count)
+
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully deleted {deleted_count} vehicle(s) from the database.'
+                f'Successfully deleted {deleted_count} vehicle(s) from the database '
+                f'in {time.perf_counter() - start:.2f}s.'
             )
         )
+
+    def truncate(self, vehicle_count):
+        """Full wipe: one TRUNCATE ... CASCADE instead of row-by-row deletes"""
+        self.stdout.write(f'Truncating vehicles and {", ".join(related_names().values())}...')
+        try:
+            truncate_vehicles()
+        except OperationalError as exc:
+            # Only a lock timeout is worth retrying; re-raise anything else.
+            # psycopg 3 reports the SQLSTATE as sqlstate, psycopg2 as pgcode.
+            cause = exc.__cause__
+            if (getattr(cause, 'sqlstate', None) or getattr(cause, 'pgcode', None)) != LOCK_NOT_AVAILABLE:
+                raise
+            raise CommandError(f'Could not lock the vehicle tables, try again: {exc}')
+        catalog_changed()
+        return vehicle_count
+
+    def delete_batched(self, queryset, vehicle_count, batch_size):
+        """Filtered wipe: keyset batches, each a short transaction"""
+        names = related_names()
+
+        def progress(deleted, related):
+            counts = ', '.join(f'{rows} {names[table]}' for table, rows in related.items())
+            self.stdout.write(f'Deleted {deleted}/{vehicle_count} vehicle(s), {counts}...')
+
+        deleted = 0
+        try:
+            deleted, _ = delete_vehicles(queryset, batch_size, progress)
+        finally:
+            # Batches bypass the model signals; report the change once, even
+            # if a later batch failed
+            catalog_changed()
+        return deleted
@@ -0,0 +1,223 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from vehicles.cache import catalog_changed
+from vehicles.models import Vehicle
+from vehicles.pgcopy import copy_rows
+
+
+IMPORT_FIELDS = ('brand', 'name', 'price', 'fuel_type', 'image_url', 'description')
+UPDATE_FIELDS = ('price', 'fuel_type', 'image_url', 'description')
+
+# One upsert from the staging table. DISTINCT ON keeps the last row of the
+# file for each (brand, name), and unchanged vehicles are left alone so
+# re-importing the same feed doesn't rewrite every row.
+UPSERT_SQL = """
+WITH upserted AS (
+    INSERT INTO vehicles_vehicle ({columns}, created_at)
+    SELECT DISTINCT ON (brand, name) {columns}, now()
+    FROM vehicles_import
+    ORDER BY brand, name, seq DESC
+    ON CONFLICT (brand, name) DO UPDATE
+    SET {updates}
+    WHERE ({current}) IS DISTINCT FROM ({excluded})
+    RETURNING xmax = 0 AS inserted
+)
+SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+FROM upserted
+""".format(
+    columns=', '.join(IMPORT_FIELDS),
+    updates=', '.join(f'{name} = EXCLUDED.{name}' for name in UPDATE_FIELDS),
+    current=', '.join(f'vehicles_vehicle.{name}' for name in UPDATE_FIELDS),
+    excluded=', '.join(f'EXCLUDED.{name}' for name in UPDATE_FIELDS),
+)
+
+
+class RecordCleaner:
+    """
+    Validates import records with the Vehicle model fields.
+
+    Running field.clean() on every value costs more than the COPY itself on
+    large feeds, so values that trivially pass (non-empty strings within
+    max_length, in-range integers) are accepted directly. Everything else goes
+    through field.clean(), memoized per distinct value, which also produces
+    the error messages.
+    """
+    _fallback = object()
+
+    def __init__(self, fields):
+        self.fields = [(field, self.get_fast_path(field)) for field in fields]
+        self.memo = {}
+
+    def get_fast_path(self, field):
+        if isinstance(field, models.URLField):
+            return None
+        if isinstance(field, (models.CharField, models.TextField)):
+            max_length = field.max_length or float('inf')
+
+            def accept_string(value):
+                if type(value) is str and 0 < len(value) <= max_length:
+                    return value
+                return self._fallback
+            return accept_string
+        if isinstance(field, models.IntegerField):
+            low, high = connection.ops.integer_field_range(field.get_internal_type())
+
+            def accept_integer(value):
+                if type(value) is str and value.isascii() and value.isdigit():
+                    value = int(value)
+                if type(value) is int and low <= value <= high:
+                    return value
+                return self._fallback
+            return accept_integer
+        return None
+
+    def clean(self, record):
+        """Validate one record and return its column values"""
+        if not isinstance(record, dict):
+            raise ValidationError('Expected a JSON object.')
+        values, errors = [], []
+        for field, fast_path in self.fields:
+            value = record.get(field.name)
+            if fast_path is not None:
+                cleaned = fast_path(value)
+                if cleaned is not self._fallback:
+                    values.append(cleaned)
+                    continue
+            try:
+                values.append(self.clean_value(field, value))
+            except ValidationError as exc:
+                errors.append(f'{field.name}: {" ".join(exc.messages)}')
+        if errors:
+            raise ValidationError(errors)
+        return tuple(values)
+
+    def clean_value(self, field, value):
+        try:
+            key = (field.name, value)
+            result = self.memo.get(key, self._fallback)
+        except TypeError:
+            # Unhashable JSON value (list, object)
+            return field.clean(value, None)
+        if result is self._fallback:
+            try:
+                result = field.clean(value, None)
+            except ValidationError as exc:
+                result = exc
+            self.memo[key] = result
+        if isinstance(result, ValidationError):
+            raise result
+        return result
+
+
+class Command(BaseCommand):
+    help = (
+        'Import vehicles from a CSV or JSON Lines file, creating new (brand, name) '
+        'entries and updating existing ones'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file to import, or - for stdin')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='Input format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Rows validated and copied per batch (default: 10000)',
+        )
+        parser.add_argument(
+            '--skip-invalid',
+            action='store_true',
+            help='Skip rows that fail validation instead of aborting the import',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if path == '-' and not options['format']:
+            raise CommandError('--format is required when reading from stdin.')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+
+        cleaner = RecordCleaner([Vehicle._meta.get_field(name) for name in IMPORT_FIELDS])
+        start = time.perf_counter()
+        total = skipped = 0
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            records = self.read_records(stream, input_format)
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    'CREATE TEMPORARY TABLE vehicles_import ('
+                    'seq bigserial, brand varchar(100), name varchar(100), price integer, '
+                    'fuel_type varchar(20), image_url varchar(200), description text'
+                    ') ON COMMIT DROP'
+                )
+                while chunk := list(islice(records, options['chunk_size'])):
+                    # Values repeat heavily within a chunk (brands, fuel
+                    # types, image URLs), so validation results are memoized
+                    # per chunk
+                    cleaner.memo.clear()
+                    rows = []
+                    for line, record in chunk:
+                        try:
+                            rows.append(cleaner.clean(record))
+                        except ValidationError as exc:
+                            if not options['skip_invalid']:
+                                raise CommandError(f'Line {line}: {"; ".join(exc.messages)}')
+                            skipped += 1
+                    copy_rows(cursor, 'vehicles_import', IMPORT_FIELDS, rows)
+                    total += len(chunk)
+                    self.stdout.write(f'Copied {total} row(s)...')
+
+                cursor.execute(UPSERT_SQL)
+                created, updated = cursor.fetchone()
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if created or updated:
+            catalog_changed()
+
+        elapsed = time.perf_counter() - start
+        # Throughput counts rows written; skipped and unchanged rows cost
+        # little and would inflate it
+        written = created + updated
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'Skipped {skipped} invalid row(s) of {total} read.'))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {written} row(s) in {elapsed:.2f}s ({written / elapsed:,.0f} rows/sec): '
+                f'{created} created, {updated} updated.'
+            )
+        )
+
+    def read_records(self, stream, input_format):
+        """Yield (line number, record dict) pairs without reading the whole file"""
+        if input_format == 'csv':
+            reader = csv.DictReader(stream)
+            missing = set(IMPORT_FIELDS) - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f'CSV header is missing column(s): {", ".join(sorted(missing))}')
+            for record in reader:
+                yield reader.line_num, record
+            return
+
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                yield line, json.loads(text)
+            except json.JSONDecodeError as exc:
+                raise CommandError(f'Line {line}: invalid JSON ({exc.msg}).')
+
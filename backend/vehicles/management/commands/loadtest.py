@@ -0,0 +1,410 @@
+import http.client
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Relative frequency of each user action. Matches the production mix: mostly
+# browsing and opening vehicles, some bookmarking and booking, and guests with
+# a booking polling "my bookings".
+DEFAULT_MIX = {
+    'browse': 45,
+    'detail': 25,
+    'bookmark': 10,
+    'book': 5,
+    'poll_bookings': 15,
+}
+SEARCH_TERMS = ['suv', 'electric', 'sedan', 'diesel', 'sunroof', 'hatchback', 'premium', 'sporty']
+MAX_PRICES = [500000, 1000000, 1500000, 2000000, 3000000, 5000000, 10000000]
+PERCENTILES = (50, 95, 99)
+# Vehicle ids loaded up front for the detail/bookmark/book actions
+CATALOG_SAMPLE_SIZE = 1000
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def parse_stages(value):
+    """'10:30,50:60,0:10' -> [(10, 30.0), (50, 60.0), (0, 10.0)]"""
+    stages = []
+    for stage in value.split(','):
+        try:
+            users, seconds = stage.split(':')
+            stages.append((int(users), float(seconds)))
+        except ValueError:
+            raise CommandError(f'Invalid stage "{stage}"; expected USERS:SECONDS.')
+        if stages[-1][0] < 0 or stages[-1][1] <= 0:
+            raise CommandError(f'Invalid stage "{stage}"; users must be >= 0 and seconds > 0.')
+    return stages
+
+
+def parse_mix(value):
+    """'browse=50,detail=30' -> DEFAULT_MIX with those weights replaced"""
+    mix = dict(DEFAULT_MIX)
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in DEFAULT_MIX:
+            raise CommandError(f'Unknown action "{name}"; choose from {", ".join(DEFAULT_MIX)}.')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f'Invalid weight for "{name}": {weight!r}.')
+    if sum(mix.values()) <= 0:
+        raise CommandError('--mix needs at least one positive weight.')
+    return mix
+
+
+def target_users(stages, elapsed):
+    """Virtual users wanted `elapsed` seconds in: linear ramps between stage targets"""
+    previous = 0
+    for users, seconds in stages:
+        if elapsed < seconds:
+            return round(previous + (users - previous) * elapsed / seconds)
+        elapsed -= seconds
+        previous = users
+    return previous
+
+
+class Stats:
+    """Thread-safe request results, kept per reporting interval"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.window = []
+        self.all = defaultdict(list)
+        self.errors = Counter()
+        self.error_count = defaultdict(int)
+
+    def record(self, action, latency_ms, error=None):
+        with self.lock:
+            self.window.append((latency_ms, error is not None))
+            self.all[action].append(latency_ms)
+            if error is not None:
+                self.errors[error] += 1
+                self.error_count[action] += 1
+
+    def take_window(self):
+        with self.lock:
+            window, self.window = self.window, []
+        return window
+
+
+class VirtualUser(threading.Thread):
+    """
+    One closed-loop guest: sends a request, waits for the response, thinks,
+    then picks the next action. Keeps its own keep-alive connection, the ids
+    it last saw while browsing and the booking/bookmark tokens it was given,
+    so bookings and bookmarks are grouped under a reused token like in the
+    frontend.
+    """
+
+    def __init__(self, runner, number):
+        super().__init__(name=f'vu-{number}', daemon=True)
+        self.runner = runner
+        self.stop = threading.Event()
+        self.rng = random.Random(f'{runner.seed}:{number}')
+        self.connection = None
+        self.seen_ids = []
+        self.next_page = None
+        self.booking_token = None
+        self.bookmark_token = None
+
+    def run(self):
+        actions, weights = zip(*self.runner.mix.items())
+        try:
+            while not self.stop.is_set():
+                action = self.rng.choices(actions, weights)[0]
+                if action == 'poll_bookings' and not self.booking_token:
+                    # Only guests who have booked poll their bookings
+                    action = 'browse'
+                getattr(self, action)()
+                if self.runner.think_time:
+                    self.stop.wait(self.rng.expovariate(1 / self.runner.think_time))
+        finally:
+            if self.connection is not None:
+                self.connection.close()
+
+    def request(self, action, method, path, body=None):
+        headers = {'Accept': 'application/json'}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = self.runner.connect()
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            # Reconnect on the next request
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = None
+            self.runner.stats.record(action, (time.perf_counter() - start) * 1000, type(exc).__name__)
+            return None
+        latency = (time.perf_counter() - start) * 1000
+
+        if response.status >= 400:
+            self.runner.stats.record(action, latency, f'HTTP {response.status}')
+            return None
+        self.runner.stats.record(action, latency)
+        try:
+            return json.loads(content) if content else None
+        except ValueError:
+            return None
+
+    def pick_vehicle(self):
+        # Guests open what they were just shown
+        return self.rng.choice(self.seen_ids or self.runner.vehicle_ids)
+
+    def browse(self):
+        rng = self.rng
+        if self.next_page and rng.random() < 0.3:
+            # Page on through the current results
+            path = self.next_page
+        else:
+            params = {}
+            if rng.random() < 0.4:
+                params['brand'] = rng.choice(self.runner.brands)
+            if rng.random() < 0.3:
+                params['fuel_type'] = rng.choice(self.runner.fuel_types)
+            if rng.random() < 0.2:
+                params['max_price'] = rng.choice(MAX_PRICES)
+            if rng.random() < 0.1:
+                params['q'] = rng.choice(SEARCH_TERMS)
+            if rng.random() < 0.2:
+                params['ordering'] = rng.choice(['price', '-price'])
+            path = f'/api/vehicles?{urlencode(params)}'
+        data = self.request('browse', 'GET', path)
+        if data and data.get('results'):
+            self.seen_ids = [vehicle['id'] for vehicle in data['results']]
+            next_url = urlsplit(data['next']) if data.get('next') else None
+            self.next_page = next_url and f'{next_url.path}?{next_url.query}'
+
+    def detail(self):
+        self.request('detail', 'GET', f'/api/vehicles/{self.pick_vehicle()}')
+
+    def bookmark(self):
+        body = {'vehicle': self.pick_vehicle()}
+        if self.bookmark_token:
+            body['bookmark_token'] = self.bookmark_token
+        data = self.request('bookmark', 'POST', '/api/bookmarks', body)
+        if data:
+            self.bookmark_token = data.get('bookmark_token')
+
+    def book(self):
+        body = {
+            'vehicle': self.pick_vehicle(),
+            'customer_name': 'Load Test',
+            'customer_email': f'{self.name}@example.com',
+        }
+        if self.booking_token:
+            body['booking_token'] = self.booking_token
+        data = self.request('book', 'POST', '/api/bookings', body)
+        if data:
+            self.booking_token = data.get('booking_token')
+
+    def poll_bookings(self):
+        self.request('poll_bookings', 'GET', f'/api/bookings/my?{urlencode({"token": self.booking_token})}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Run concurrent closed-loop virtual users against a running server with a realistic '
+        'traffic mix and report throughput, latency percentiles and error rate over time'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000', help='Server to test (default: http://localhost:8000)')
+        parser.add_argument('--users', type=int, default=20, help='Concurrent virtual users (default: 20)')
+        parser.add_argument('--ramp-up', type=float, default=10, help='Seconds to reach --users (default: 10)')
+        parser.add_argument('--duration', type=float, default=60, help='Seconds at full load after ramp-up (default: 60)')
+        parser.add_argument(
+            '--stages',
+            help='Load profile as USERS:SECONDS,... with linear ramps between targets, e.g. '
+                 '10:30,50:60,50:120,0:10 (overrides --users/--ramp-up/--duration)',
+        )
+        parser.add_argument(
+            '--think-time',
+            type=float,
+            default=1.0,
+            help='Mean pause between a user\'s requests in seconds, exponentially distributed; '
+                 '0 for none (default: 1.0)',
+        )
+        parser.add_argument(
+            '--mix',
+            help=f'Override action weights, e.g. browse=60,book=0 (actions: {", ".join(DEFAULT_MIX)})',
+        )
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between progress lines (default: 5)')
+        parser.add_argument('--timeout', type=float, default=10, help='Request timeout in seconds (default: 10)')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for user behaviour (default: 1)')
+        parser.add_argument('--save', metavar='PATH', help='Write the timeline and summary as JSON')
+
+    def handle(self, *args, **options):
+        if options['stages']:
+            self.stages = parse_stages(options['stages'])
+        else:
+            if options['users'] < 1:
+                raise CommandError('--users must be positive.')
+            self.stages = [(options['users'], max(options['ramp_up'], 0.001)), (options['users'], options['duration'])]
+        self.mix = parse_mix(options['mix']) if options['mix'] else DEFAULT_MIX
+        self.think_time = max(options['think_time'], 0)
+        self.seed = options['seed']
+        self.timeout = options['timeout']
+
+        url = urlsplit(options['url'])
+        if url.scheme not in ('http', 'https') or not url.hostname:
+            raise CommandError(f'Invalid --url {options["url"]}.')
+        self.connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.host, self.port = url.hostname, url.port
+        self.load_catalog(options['url'])
+
+        self.stats = Stats()
+        timeline = self.run_load(options['interval'])
+        summary = self.summarize()
+        self.print_summary(summary)
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump({'stages': self.stages, 'timeline': timeline, 'summary': summary}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Saved results to {options["save"]}.'))
+
+    def connect(self):
+        return self.connection_class(self.host, self.port, timeout=self.timeout)
+
+    def get_json(self, path):
+        connection = self.connect()
+        try:
+            connection.request('GET', path, headers={'Accept': 'application/json'})
+            response = connection.getresponse()
+            content = response.read()
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise CommandError(f'GET {path} returned {response.status}.')
+        return json.loads(content)
+
+    def load_catalog(self, url):
+        """
+        Brands, fuel types and up to CATALOG_SAMPLE_SIZE vehicle ids for the
+        users to pick from. Only cursor pagination honours page_size, so the
+        ids are read through cursor pages.
+        """
+        self.vehicle_ids = []
+        try:
+            summary = self.get_json('/api/vehicles/summary')
+            path = '/api/vehicles?pagination=cursor&page_size=100&fields=id'
+            while path and len(self.vehicle_ids) < CATALOG_SAMPLE_SIZE:
+                page = self.get_json(path)
+                self.vehicle_ids += [vehicle['id'] for vehicle in page['results']]
+                next_url = urlsplit(page['next']) if page['next'] else None
+                path = next_url and f'{next_url.path}?{next_url.query}'
+        except (OSError, http.client.HTTPException, ValueError) as exc:
+            raise CommandError(f'Cannot reach {url}: {exc}. Is the server running (docker compose up)?')
+        self.brands = [row['brand'] for row in summary] or ['Toyota']
+        self.fuel_types = sorted({fuel for row in summary for fuel in row['fuel_types']}) or ['Petrol']
+        if not self.vehicle_ids:
+            raise CommandError('The server has no vehicles. Run seed_vehicles first.')
+
+    def run_load(self, interval):
+        total = sum(seconds for _, seconds in self.stages)
+        self.stdout.write(
+            f'{"time":>6} {"users":>6} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"errors":>8}'
+        )
+        users = []
+        timeline = []
+        started = next_report = time.monotonic()
+        next_report += interval
+        try:
+            while True:
+                now = time.monotonic()
+                elapsed = now - started
+                if elapsed >= total:
+                    break
+                wanted = target_users(self.stages, elapsed)
+                while len(users) < wanted:
+                    user = VirtualUser(self, len(users))
+                    users.append(user)
+                    user.start()
+                while len(users) > wanted:
+                    users.pop().stop.set()
+                if now >= next_report:
+                    timeline.append(self.report(elapsed, len(users), interval))
+                    next_report += interval
+                time.sleep(0.05)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Interrupted, stopping users...'))
+        finally:
+            for user in users:
+                user.stop.set()
+            for user in users:
+                user.join(self.timeout)
+        self.elapsed = time.monotonic() - started
+        return timeline
+
+    def report(self, elapsed, users, interval):
+        window = self.stats.take_window()
+        latencies = sorted(latency for latency, _ in window)
+        errors = sum(1 for _, failed in window if failed)
+        row = {
+            'time': round(elapsed, 1),
+            'users': users,
+            'rps': round(len(window) / interval, 1),
+            **{f'p{q}_ms': round(percentile(latencies, q), 2) for q in PERCENTILES},
+            'error_rate': round(errors / len(window), 4) if window else 0.0,
+        }
+        line = (
+            f'{row["time"]:>5.0f}s {users:>6} {row["rps"]:>8.1f} {row["p50_ms"]:>8.1f} '
+            f'{row["p95_ms"]:>8.1f} {row["p99_ms"]:>8.1f} {row["error_rate"]:>7.1%}'
+        )
+        self.stdout.write(self.style.WARNING(line) if errors else line)
+        return row
+
+    def summarize(self):
+        actions = {}
+        for action, latencies in sorted(self.stats.all.items()):
+            latencies = sorted(latencies)
+            actions[action] = {
+                'requests': len(latencies),
+                'rps': round(len(latencies) / self.elapsed, 1),
+                **{f'p{q}_ms': round(percentile(latencies, q), 2) for q in PERCENTILES},
+                'errors': self.stats.error_count[action],
+            }
+        requests = sum(row['requests'] for row in actions.values())
+        errors = sum(row['errors'] for row in actions.values())
+        return {
+            'duration_s': round(self.elapsed, 1),
+            'requests': requests,
+            'rps': round(requests / self.elapsed, 1),
+            'error_rate': round(errors / requests, 4) if requests else 0.0,
+            'errors': dict(self.stats.errors.most_common()),
+            'actions': actions,
+        }
+
+    def print_summary(self, summary):
+        self.stdout.write('')
+        header = f'{"action":<15} {"requests":>9} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"errors":>7}'
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for action, row in summary['actions'].items():
+            self.stdout.write(
+                f'{action:<15} {row["requests"]:>9} {row["rps"]:>8.1f} {row["p50_ms"]:>8.1f} '
+                f'{row["p95_ms"]:>8.1f} {row["p99_ms"]:>8.1f} {row["errors"]:>7}'
+            )
+        for error, count in summary['errors'].items():
+            self.stdout.write(self.style.WARNING(f'{error}: {count}'))
+        style = self.style.WARNING if summary['errors'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f'{summary["requests"]} request(s) in {summary["duration_s"]}s: {summary["rps"]} req/s, '
+            f'{summary["error_rate"]:.2%} errors.'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from vehicles.models import VehicleSummary
+from vehicles.summary import rebuild_vehicle_summary
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-brand/fuel vehicle summary table from the vehicles table'
+
+    def handle(self, *args, **options):
+        drifted = rebuild_vehicle_summary()
+
+        if drifted:
+            self.stdout.write(
+                self.style.WARNING(f'Corrected {drifted} drifted summary row(s).')
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Successfully rebuilt vehicle summary ({VehicleSummary.objects.count()} brand/fuel row(s)).'
+            )
+        )
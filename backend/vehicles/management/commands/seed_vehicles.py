@@ -1,191 +1,142 @@
-from django.core.management.base import BaseCommand
+import time
+from datetime import date, datetime, time as dt_time, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from vehicles import synthetic
+from vehicles.cache import catalog_changed
+from vehicles.catalog import CATALOG, sync_catalog
 from vehicles.models import Vehicle
 
 
 class Command(BaseCommand):
     help = 'Seed the database with vehicle data'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--synthetic',
+            action='store_true',
+            help='Generate a large synthetic dataset instead of the sample vehicles',
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Also update sample vehicles whose price, fuel type, image or description differ from the catalog',
+        )
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='With --sync, delete every vehicle that is not in the catalog, with its bookings and bookmarks',
+        )
+        parser.add_argument('--vehicles', type=int, default=100000, help='Synthetic vehicles (default: 100000)')
+        parser.add_argument('--bookings', type=int, default=0, help='Synthetic bookings (default: 0)')
+        parser.add_argument('--bookmarks', type=int, default=0, help='Synthetic bookmarks (default: 0)')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+        parser.add_argument(
+            '--as-of',
+            type=date.fromisoformat,
+            default=datetime.now(timezone.utc).date(),
+            help='Generated timestamps fall in the three years before this date (default: today, UTC)',
+        )
+        parser.add_argument('--workers', type=int, default=4, help='Parallel COPY threads (default: 4)')
+        parser.add_argument('--batch-size', type=int, default=20000, help='Rows per COPY (default: 20000)')
+
     def handle(self, *args, **options):
-        vehicles_data = [
-            {
-                'brand': 'Toyota',
-                'name': 'Camry',
-                'price': 2075000,  # 25000 USD * 83 = 2,075,000 INR
-                'fuel_type': 'Petrol',
-                'image_url': 'https://images.unsplash.com/photo-1549317661-bd32c8ce0db2?w=800',
-                'description': 'Reliable and fuel-efficient sedan with advanced safety features and comfortable interior.'
-            },
-            {
-                'brand': 'Toyota',
-                'name': 'Prius',
-                'price': 2324000,  # 28000 USD * 83 = 2,324,000 INR
-                'fuel_type': 'Electric',
-                'image_url': 'https://images.unsplash.com/photo-1593941707882-a5bac6861d0c?w=800',
-                'description': 'Eco-friendly hybrid vehicle with excellent fuel economy and modern technology features.'
-            },
-            {
-                'brand': 'Honda',
-                'name': 'Civic',
-                'price': 1826000,  # 22000 USD * 83 = 1,826,000 INR
-                'fuel_type': 'Petrol',
-                'image_url': 'https://images.unsplash.com/photo-1606664515524-ed2f786a0bd6?w=800',
-                'description': 'Sporty compact car with responsive handling and a well-designed interior.'
-            },
-            {
-                'brand': 'Honda',
-                'name': 'Accord',
-                'price': 2241000,  # 27000 USD * 83 = 2,241,000 INR
-                'fuel_type': 'Petrol',
-                'image_url': 'https://images.unsplash.com/photo-1606664515524-ed2f786a0bd6?w=800',
-                'description': 'Spacious midsize sedan with powerful engine and premium features.'
-            },
-            {
-                'brand': 'Ford',
-                'name': 'F-150',
-                'price': 2905000,  # 35000 USD * 83 = 2,905,000 INR
-                'fuel_type': 'Diesel',
-                'image_url': 'https://images.unsplash.com/photo-1552519507-da3b142c6e3d?w=800',
-                'description': 'Robust pickup truck with impressive towing capacity and durable build quality.'
-            },
-            {
-                'brand': 'Ford',
-                'name': 'Mustang',
-                'price': 2656000,  # 32000 USD * 83 = 2,656,000 INR
-                'fuel_type': 'Petrol',
-                'image_url': 'https://images.unsplash.com/photo-1552519507-da3b142c6e3d?w=800',
-                'description': 'Iconic sports car with powerful V8 engine and aggressive styling.'
-            },
-            {
-                'brand': 'Tesla',
-                'name': 'Model 3',
-                'price': 3320000,  # 40000 USD * 83 = 3,320,000 INR
-                'fuel_type': 'Electric',
-                'image_url': 'https://images.unsplash.com/photo-1560958089-b8a1929cea89?w=800',
-                'description': 'Premium electric sedan with autopilot features and impressive range.'
-            },
-            {
-                'brand': 'Tesla',
-                'name': 'Model S',
-                'price': 6225000,  # 75000 USD * 83 = 6,225,000 INR
-                'fuel_type': 'Electric',
-                'image_url': 'https://images.unsplash.com/photo-1560958089-b8a1929cea89?w=800',
-                'description': 'Luxury electric vehicle with cutting-edge technology and exceptional performance.'
-            },
-            {
-                'brand': 'BMW',
-                'name': '3 Series',
-                'price': 3486000,  # 42000 USD * 83 = 3,486,000 INR
-                'fuel_type': 'Petrol',
-                'image_url': 'https://images.unsplash.com/photo-1555215695-3004980ad54e?w=800',
-                'description': 'Luxury compact sedan with sporty performance and premium interior materials.'
-            },
-            {
-                'brand': 'BMW',
-                'name': 'X5',
-                'price': 4565000,  # 55000 USD * 83 = 4,565,000 INR
-                'fuel_type': 'Diesel',
-                'image_url': 'https://images.unsplash.com/photo-1555215695-3004980ad54e?w=800',
-                'description': 'Premium SUV with spacious cabin and advanced driving assistance systems.'
-            },
-            {
-                'brand': 'Mercedes-Benz',
-                'name': 'C-Class',
-                'price': 3735000,  # 45000 USD * 83 = 3,735,000 INR
-                'fuel_type': 'Petrol',
-                'image_url': 'https://images.unsplash.com/photo-1617531653332-bd46c24f2068?w=800',
-                'description': 'Elegant luxury sedan with sophisticated design and advanced technology.'
-            },
-            {
-                'brand': 'Mercedes-Benz',
-                'name': 'E-Class',
-                'price': 4814000,  # 58000 USD * 83 = 4,814,000 INR
-                'fuel_type': 'Diesel',
-                'image_url': 'https://images.unsplash.com/photo-1617531653332-bd46c24f2068?w=800',
-                'description': 'Executive luxury sedan with exceptional comfort and powerful engine options.'
-            },
-            {
-                'brand': 'Audi',
-                'name': 'A4',
-                'price': 3320000,  # 40000 USD * 83 = 3,320,000 INR
-                'fuel_type': 'Petrol',
-                'image_url': 'https://images.unsplash.com/photo-1606664515524-ed2f786a0bd6?w=800',
-                'description': 'Premium compact sedan with quattro all-wheel drive and refined interior.'
-            },
-            {
-                'brand': 'Audi',
-                'name': 'Q7',
-                'price': 4980000,  # 60000 USD * 83 = 4,980,000 INR
-                'fuel_type': 'Diesel',
-                'image_url': 'https://images.unsplash.com/photo-1606664515524-ed2f786a0bd6?w=800',
-                'description': 'Luxury three-row SUV with advanced safety features and premium amenities.'
-            },
-            {
-                'brand': 'Nissan',
-                'name': 'Altima',
-                'price': 1992000,  # 24000 USD * 83 = 1,992,000 INR
-                'fuel_type': 'Petrol',
-                'image_url': 'https://images.unsplash.com/photo-1549317661-bd32c8ce0db2?w=800',
-                'description': 'Comfortable midsize sedan with good fuel economy and modern infotainment system.'
-            },
-            {
-                'brand': 'Nissan',
-                'name': 'Leaf',
-                'price': 2656000,  # 32000 USD * 83 = 2,656,000 INR
-                'fuel_type': 'Electric',
-                'image_url': 'https://images.unsplash.com/photo-1593941707882-a5bac6861d0c?w=800',
-                'description': 'Affordable electric vehicle with practical range and user-friendly features.'
-            },
-            {
-                'brand': 'Chevrolet',
-                'name': 'Silverado',
-                'price': 2739000,  # 33000 USD * 83 = 2,739,000 INR
-                'fuel_type': 'Diesel',
-                'image_url': 'https://images.unsplash.com/photo-1552519507-da3b142c6e3d?w=800',
-                'description': 'Full-size pickup truck with strong towing capabilities and modern technology.'
-            },
-            {
-                'brand': 'Hyundai',
-                'name': 'Elantra',
-                'price': 1660000,  # 20000 USD * 83 = 1,660,000 INR
-                'fuel_type': 'Petrol',
-                'image_url': 'https://images.unsplash.com/photo-1549317661-bd32c8ce0db2?w=800',
-                'description': 'Value-packed compact sedan with generous warranty and modern features.'
-            },
-            {
-                'brand': 'Hyundai',
-                'name': 'Kona Electric',
-                'price': 3154000,  # 38000 USD * 83 = 3,154,000 INR
-                'fuel_type': 'Electric',
-                'image_url': 'https://images.unsplash.com/photo-1593941707882-a5bac6861d0c?w=800',
-                'description': 'Compact electric SUV with impressive range and quick charging capability.'
-            },
-            {
-                'brand': 'Volkswagen',
-                'name': 'Jetta',
-                'price': 1743000,  # 21000 USD * 83 = 1,743,000 INR
-                'fuel_type': 'Petrol',
-                'image_url': 'https://images.unsplash.com/photo-1549317661-bd32c8ce0db2?w=800',
-                'description': 'German-engineered compact sedan with efficient engine and quality build.'
-            },
-        ]
-
-        created_count = 0
-        for vehicle_data in vehicles_data:
-            vehicle, created = Vehicle.objects.get_or_create(
-                brand=vehicle_data['brand'],
-                name=vehicle_data['name'],
-                defaults=vehicle_data
+        if options['synthetic']:
+            return self.seed_synthetic(options)
+
+        if options['delete'] and not options['sync']:
+            raise CommandError('--delete requires --sync.')
+
+        created, updated, deleted = sync_catalog(CATALOG, update=options['sync'], delete=options['delete'])
+        for vehicle in created:
+            self.stdout.write(self.style.SUCCESS(f'Created vehicle: {vehicle.brand} {vehicle.name}'))
+        for vehicle in updated:
+            self.stdout.write(self.style.SUCCESS(f'Updated vehicle: {vehicle.brand} {vehicle.name}'))
+        if deleted:
+            self.stdout.write(self.style.WARNING(f'Deleted {deleted} vehicle(s) not in the catalog.'))
+
+        unchanged = len(CATALOG) - len(created) - len(updated)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nSuccessfully created {len(created)} and updated {len(updated)} vehicles '
+                f'({unchanged} unchanged). Total vehicles: {Vehicle.objects.count()}'
+            )
+        )
+
+    def seed_synthetic(self, options):
+        """
+        Generate --vehicles/--bookings/--bookmarks rows with COPY on parallel
+        worker threads. The data only depends on --seed and --as-of.
+
+        Every batch commits on its own, so a failed run leaves the batches
+        loaded before it failed. Rerunning a seed that already has data is
+        refused, for every table alike; clear the data first.
+        """
+        seed, workers, batch_size = options['seed'], options['workers'], options['batch_size']
+        if min(workers, batch_size) < 1 or min(options['vehicles'], options['bookings'], options['bookmarks']) < 0:
+            raise CommandError('--workers and --batch-size must be positive and row counts non-negative.')
+        now = datetime.combine(options['as_of'], dt_time.min, tzinfo=timezone.utc)
+        batches = {
+            kind: synthetic.split_batches(options[kind], batch_size)
+            for kind in ('vehicles', 'bookings', 'bookmarks')
+        }
+        existing = synthetic.existing_tables(seed, batches['vehicles'], batches['bookings'], batches['bookmarks'])
+        if existing:
+            raise CommandError(
+                f'Synthetic {", ".join(existing)} for seed {seed} already exist, possibly from an interrupted run. '
+                'Remove them with clear_vehicles, or use another --seed.'
+            )
+
+        try:
+            self.load_synthetic(options, batches, now)
+        except IntegrityError as exc:
+            # Another run with the same seed got there first
+            raise CommandError(f'Synthetic data for seed {seed} clashes with existing rows: {exc}')
+
+    def load_synthetic(self, options, batches, now):
+        seed, workers = options['seed'], options['workers']
+
+        def progress(table, total):
+            return lambda loaded: self.stdout.write(f'{table}: {loaded}/{total} row(s)')
+
+        start = time.perf_counter()
+        loaded = synthetic.copy_in_parallel(
+            'vehicles_vehicle', synthetic.VEHICLE_COLUMNS,
+            batches['vehicles'],
+            lambda batch: synthetic.vehicle_rows(seed, batch[0], batch[1], batch[2], now),
+            workers, progress('vehicles', options['vehicles']),
+        )
+        # COPY bypasses the model signals
+        catalog_changed()
+        self.report('vehicles', loaded, start)
+
+        if not options['bookings'] and not options['bookmarks']:
+            return
+
+        vehicle_ids = list(Vehicle.objects.order_by('id').values_list('id', flat=True))
+        if not vehicle_ids:
+            raise CommandError('Bookings and bookmarks need vehicles. Generate some with --vehicles.')
+
+        for table, kind, columns, make_rows in [
+            ('bookings_booking', 'bookings', synthetic.BOOKING_COLUMNS, synthetic.booking_rows),
+            ('bookmarks_bookmark', 'bookmarks', synthetic.BOOKMARK_COLUMNS, synthetic.bookmark_rows),
+        ]:
+            if not options[kind]:
+                continue
+            start = time.perf_counter()
+            loaded = synthetic.copy_in_parallel(
+                table, columns,
+                batches[kind],
+                lambda batch, make_rows=make_rows: make_rows(seed, batch[0], batch[2], vehicle_ids, now),
+                workers, progress(kind, options[kind]),
             )
-            if created:
-                created_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(f'Created vehicle: {vehicle.brand} {vehicle.name}')
-                )
-            else:
-                self.stdout.write(
-                    self.style.WARNING(f'Vehicle already exists: {vehicle.brand} {vehicle.name}')
-                )
+            self.report(kind, loaded, start)
 
+    def report(self, kind, loaded, start):
+        elapsed = time.perf_counter() - start
         self.stdout.write(
-            self.style.SUCCESS(f'\nSuccessfully created {created_count} vehicles. Total vehicles: {Vehicle.objects.count()}')
+            self.style.SUCCESS(
+                f'Loaded {loaded} {kind} in {elapsed:.2f}s ({loaded / max(elapsed, 1e-9):,.0f} rows/sec).'
+            )
         )
@@ -0,0 +1,117 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+SORT_KEYS = {
+    'total': lambda query: query['total_ms'],
+    'count': lambda query: query['count'],
+    'mean': lambda query: query['total_ms'] / query['count'],
+    'max': lambda query: query['max_ms'],
+}
+
+
+def plan_nodes(node, depth=0):
+    """(depth, node) for every node of an EXPLAIN (FORMAT JSON) plan tree"""
+    yield depth, node
+    for child in node.get('Plans', ()):
+        yield from plan_nodes(child, depth + 1)
+
+
+def describe_node(node):
+    text = node['Node Type']
+    if 'Relation Name' in node:
+        text += f' on {node["Relation Name"]}'
+    if 'Index Name' in node:
+        text += f' using {node["Index Name"]}'
+    if 'Actual Total Time' in node:
+        text += (
+            f' (actual {node["Actual Total Time"]:.2f} ms, rows={node["Actual Rows"]}, '
+            f'loops={node["Actual Loops"]}'
+        )
+        if 'Shared Hit Blocks' in node:
+            text += f', shared hit={node["Shared Hit Blocks"]} read={node["Shared Read Blocks"]}'
+        text += ')'
+    return text
+
+
+class Command(BaseCommand):
+    help = 'Summarize the slow query log (SLOW_QUERY_LOG) by query fingerprint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', help='Slow query log to read (default: SLOW_QUERY_LOG)')
+        parser.add_argument('--limit', type=int, default=10, help='Queries to show (default: 10)')
+        parser.add_argument(
+            '--sort',
+            choices=sorted(SORT_KEYS),
+            default='total',
+            help='Rank by total, count, mean or max time (default: total)',
+        )
+        parser.add_argument('--plans', action='store_true', help='Print the latest sampled plan of each query')
+
+    def handle(self, *args, **options):
+        path = options['log'] or settings.SLOW_QUERY_LOG
+        queries, invalid = self.read_log(path)
+        if invalid:
+            self.stdout.write(self.style.WARNING(f'Skipped {invalid} malformed line(s).'))
+        if not queries:
+            self.stdout.write(f'No slow queries logged in {path}.')
+            return
+
+        ranked = sorted(queries.values(), key=SORT_KEYS[options['sort']], reverse=True)
+        self.stdout.write(
+            f'{len(queries)} slow query fingerprint(s), {sum(q["count"] for q in queries.values())} execution(s).'
+        )
+        for query in ranked[:options['limit']]:
+            self.print_query(query, options['plans'])
+
+    def read_log(self, path):
+        queries = {}
+        invalid = 0
+        try:
+            f = open(path, encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f'Cannot read slow query log {path}: {exc.strerror}.')
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    key, duration = entry['fingerprint'], float(entry['duration_ms'])
+                except (ValueError, KeyError, TypeError):
+                    invalid += 1
+                    continue
+                query = queries.setdefault(key, {
+                    'fingerprint': key, 'sql': entry.get('sql', ''), 'count': 0,
+                    'total_ms': 0.0, 'max_ms': 0.0, 'last_seen': None, 'plan': None,
+                })
+                query['count'] += 1
+                query['total_ms'] += duration
+                query['max_ms'] = max(query['max_ms'], duration)
+                query['last_seen'] = entry.get('time')
+                if isinstance(entry.get('plan'), list):
+                    query['plan'] = entry['plan'][0]
+        return queries, invalid
+
+    def print_query(self, query, show_plan):
+        self.stdout.write('')
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{query["fingerprint"]}  count={query["count"]}  total={query["total_ms"]:.1f} ms  '
+            f'mean={query["total_ms"] / query["count"]:.1f} ms  max={query["max_ms"]:.1f} ms  '
+            f'last={query["last_seen"]}'
+        ))
+        self.stdout.write(f'  {query["sql"]}')
+
+        plan = query['plan']
+        if plan is None:
+            return
+        nodes = list(plan_nodes(plan['Plan']))
+        seq_scans = sorted({node['Relation Name'] for _, node in nodes if node['Node Type'] == 'Seq Scan'})
+        if seq_scans:
+            self.stdout.write(self.style.WARNING(f'  Seq Scan on {", ".join(seq_scans)}'))
+        if show_plan:
+            for depth, node in nodes:
+                self.stdout.write(f'  {"  " * depth}-> {describe_node(node)}')
+            self.stdout.write(
+                f'  Planning {plan.get("Planning Time", 0):.2f} ms, execution {plan.get("Execution Time", 0):.2f} ms'
+            )
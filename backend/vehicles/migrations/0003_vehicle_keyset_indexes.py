@@ -0,0 +1,25 @@
+# Generated by Django 5.2.10 on 2026-10-17 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0002_remove_vehicle_vehicles_ve_brand_768e26_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='vehicle',
+            name='vehicle_price_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['price', '-created_at', '-id'], name='vehicle_price_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['-created_at', '-id'], name='vehicle_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,134 @@
+# Generated by Django 5.2.10 on 2026-10-17 17:34
+
+from django.db import migrations, models
+
+
+# Statement-level triggers keep vehicles_vehiclesummary in step with
+# vehicles_vehicle inside the writing transaction. Transition tables give each
+# trigger the full set of affected rows, so a bulk insert or delete costs one
+# grouped upsert instead of one summary update per row.
+CREATE_TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION vehicles_summary_add() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO vehicles_vehiclesummary AS s (brand, fuel_type, total, price_sum, min_price, max_price)
+    SELECT brand, fuel_type, count(*), sum(price), min(price), max(price)
+    FROM new_rows
+    GROUP BY brand, fuel_type
+    ORDER BY brand, fuel_type
+    ON CONFLICT (brand, fuel_type) DO UPDATE SET
+        total = s.total + EXCLUDED.total,
+        price_sum = s.price_sum + EXCLUDED.price_sum,
+        min_price = LEAST(s.min_price, EXCLUDED.min_price),
+        max_price = GREATEST(s.max_price, EXCLUDED.max_price);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION vehicles_summary_remove() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- Removed rows that held a group's min/max price force a recompute of
+    -- that extreme from the remaining rows (via vehicle_brand_fuel_idx).
+    WITH removed AS (
+        SELECT brand, fuel_type, count(*) AS total, sum(price) AS price_sum,
+               min(price) AS min_price, max(price) AS max_price
+        FROM old_rows
+        GROUP BY brand, fuel_type
+    )
+    UPDATE vehicles_vehiclesummary AS s SET
+        total = s.total - r.total,
+        price_sum = s.price_sum - r.price_sum,
+        min_price = CASE WHEN r.min_price <= s.min_price THEN (
+            SELECT min(v.price) FROM vehicles_vehicle AS v
+            WHERE v.brand = s.brand AND v.fuel_type = s.fuel_type
+        ) ELSE s.min_price END,
+        max_price = CASE WHEN r.max_price >= s.max_price THEN (
+            SELECT max(v.price) FROM vehicles_vehicle AS v
+            WHERE v.brand = s.brand AND v.fuel_type = s.fuel_type
+        ) ELSE s.max_price END
+    FROM removed AS r
+    WHERE s.brand = r.brand AND s.fuel_type = r.fuel_type;
+
+    DELETE FROM vehicles_vehiclesummary WHERE total <= 0;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION vehicles_summary_truncate() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM vehicles_vehiclesummary;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER vehicles_summary_insert
+    AFTER INSERT ON vehicles_vehicle
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION vehicles_summary_add();
+
+CREATE TRIGGER vehicles_summary_update_add
+    AFTER UPDATE ON vehicles_vehicle
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION vehicles_summary_add();
+
+CREATE TRIGGER vehicles_summary_update_remove
+    AFTER UPDATE ON vehicles_vehicle
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION vehicles_summary_remove();
+
+CREATE TRIGGER vehicles_summary_delete
+    AFTER DELETE ON vehicles_vehicle
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION vehicles_summary_remove();
+
+CREATE TRIGGER vehicles_summary_truncate
+    AFTER TRUNCATE ON vehicles_vehicle
+    FOR EACH STATEMENT EXECUTE FUNCTION vehicles_summary_truncate();
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS vehicles_summary_insert ON vehicles_vehicle;
+DROP TRIGGER IF EXISTS vehicles_summary_update_add ON vehicles_vehicle;
+DROP TRIGGER IF EXISTS vehicles_summary_update_remove ON vehicles_vehicle;
+DROP TRIGGER IF EXISTS vehicles_summary_delete ON vehicles_vehicle;
+DROP TRIGGER IF EXISTS vehicles_summary_truncate ON vehicles_vehicle;
+DROP FUNCTION IF EXISTS vehicles_summary_add();
+DROP FUNCTION IF EXISTS vehicles_summary_remove();
+DROP FUNCTION IF EXISTS vehicles_summary_truncate();
+"""
+
+BACKFILL_SQL = """
+INSERT INTO vehicles_vehiclesummary (brand, fuel_type, total, price_sum, min_price, max_price)
+SELECT brand, fuel_type, count(*), sum(price), min(price), max(price)
+FROM vehicles_vehicle
+GROUP BY brand, fuel_type;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0003_vehicle_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehicleSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('brand', models.CharField(max_length=100)),
+                ('fuel_type', models.CharField(max_length=20)),
+                ('total', models.IntegerField(default=0)),
+                ('price_sum', models.BigIntegerField(default=0)),
+                ('min_price', models.IntegerField(null=True)),
+                ('max_price', models.IntegerField(null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('brand', 'fuel_type'), name='vehicle_summary_brand_fuel_uniq')],
+            },
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
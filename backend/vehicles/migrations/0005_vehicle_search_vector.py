@@ -0,0 +1,54 @@
+# Generated by Django 5.2.10 on 2026-10-17 17:37
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Keep search_vector in step with the text columns on every insert and on
+# updates that touch them, including bulk writes that bypass the ORM.
+CREATE_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION vehicles_search_vector_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.brand, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER vehicles_search_vector
+    BEFORE INSERT OR UPDATE OF brand, name, description ON vehicles_vehicle
+    FOR EACH ROW EXECUTE FUNCTION vehicles_search_vector_update();
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS vehicles_search_vector ON vehicles_vehicle;
+DROP FUNCTION IF EXISTS vehicles_search_vector_update();
+"""
+
+# Route existing rows through the trigger so the expression lives in one place
+BACKFILL_SQL = "UPDATE vehicles_vehicle SET name = name;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0004_vehiclesummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER_SQL, DROP_TRIGGER_SQL),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='vehicle_search_idx'),
+        ),
+    ]
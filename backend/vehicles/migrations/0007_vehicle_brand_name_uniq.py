@@ -0,0 +1,65 @@
+# Generated by Django 5.2.10 on 2026-10-17 17:48
+
+from django.db import migrations, models
+
+
+# Merge vehicles that share a (brand, name) into the oldest one before the
+# unique constraint is added: bookings and bookmarks are repointed to the kept
+# vehicle (dropping bookmarks that would then be duplicates of an existing
+# one for the same token) and the other copies are deleted.
+MERGE_DUPLICATE_VEHICLES_SQL = """
+SET CONSTRAINTS ALL IMMEDIATE;
+
+CREATE TEMPORARY TABLE vehicle_duplicates ON COMMIT DROP AS
+SELECT id, keep_id
+FROM (
+    SELECT id, min(id) OVER (PARTITION BY brand, name) AS keep_id
+    FROM vehicles_vehicle
+) v
+WHERE id <> keep_id;
+
+UPDATE bookings_booking b
+SET vehicle_id = d.keep_id
+FROM vehicle_duplicates d
+WHERE b.vehicle_id = d.id;
+
+DELETE FROM bookmarks_bookmark
+WHERE id IN (
+    SELECT id
+    FROM (
+        SELECT bm.id, row_number() OVER (
+            PARTITION BY bm.bookmark_token, COALESCE(d.keep_id, bm.vehicle_id)
+            ORDER BY bm.id
+        ) AS n
+        FROM bookmarks_bookmark bm
+        LEFT JOIN vehicle_duplicates d ON d.id = bm.vehicle_id
+    ) ranked
+    WHERE n > 1
+);
+
+UPDATE bookmarks_bookmark b
+SET vehicle_id = d.keep_id
+FROM vehicle_duplicates d
+WHERE b.vehicle_id = d.id;
+
+DELETE FROM vehicles_vehicle v
+USING vehicle_duplicates d
+WHERE v.id = d.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0006_vehicle_trigram_indexes'),
+        ('bookings', '0005_booking_booking_token_created_idx'),
+        ('bookmarks', '0005_bookmark_token_vehicle_uniq'),
+    ]
+
+    operations = [
+        migrations.RunSQL(MERGE_DUPLICATE_VEHICLES_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='vehicle',
+            constraint=models.UniqueConstraint(fields=('brand', 'name'), name='vehicle_brand_name_uniq'),
+        ),
+    ]
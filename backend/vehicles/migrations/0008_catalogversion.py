@@ -0,0 +1,51 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+
+# One statement-level trigger bumps the catalog version for every statement
+# that writes vehicles_vehicle, in the writing transaction. The counter starts
+# from the clock (microseconds) so a recreated database never reuses version
+# numbers that a shared cache may still hold entries for; the upsert recreates
+# the row the same way if it was deleted (e.g. by `manage.py flush`).
+CREATE_TRIGGER_SQL = """
+INSERT INTO vehicles_catalogversion (id, version)
+VALUES (1, (extract(epoch FROM clock_timestamp()) * 1000000)::bigint);
+
+CREATE OR REPLACE FUNCTION vehicles_catalog_version_bump() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO vehicles_catalogversion AS v (id, version)
+    VALUES (1, (extract(epoch FROM clock_timestamp()) * 1000000)::bigint)
+    ON CONFLICT (id) DO UPDATE SET version = v.version + 1;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER vehicles_catalog_version_bump
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON vehicles_vehicle
+    FOR EACH STATEMENT EXECUTE FUNCTION vehicles_catalog_version_bump();
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS vehicles_catalog_version_bump ON vehicles_vehicle;
+DROP FUNCTION IF EXISTS vehicles_catalog_version_bump();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0007_vehicle_brand_name_uniq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField()),
+            ],
+        ),
+        migrations.RunSQL(CREATE_TRIGGER_SQL, DROP_TRIGGER_SQL),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.10 on 2026-10-17 23:40
+
+from django.db import migrations
+
+
+# Bump the catalog version once per transaction, when it commits, instead of
+# once per statement. Each statement writing vehicles_vehicle only marks its
+# transaction (a transaction-local setting) and queues a row in
+# vehicles_catalogchange on the first write. A deferred constraint trigger on
+# that row upserts the version at commit, so concurrent writers (parallel COPY
+# workers, sync batches) only serialize on the version row for the instant of
+# their commit rather than from their first write until they commit.
+CREATE_TRIGGERS_SQL = """
+CREATE TABLE vehicles_catalogchange (id bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY);
+
+CREATE OR REPLACE FUNCTION vehicles_catalog_changed() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF current_setting('vehicles.catalog_changed', true) IS DISTINCT FROM 'on' THEN
+        PERFORM set_config('vehicles.catalog_changed', 'on', true);
+        INSERT INTO vehicles_catalogchange DEFAULT VALUES;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION vehicles_catalog_version_bump() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO vehicles_catalogversion AS v (id, version)
+    VALUES (1, (extract(epoch FROM clock_timestamp()) * 1000000)::bigint)
+    ON CONFLICT (id) DO UPDATE SET version = v.version + 1;
+    DELETE FROM vehicles_catalogchange WHERE id = NEW.id;
+    -- Only matters under SET CONSTRAINTS ... IMMEDIATE, where later
+    -- statements of the transaction bump the version again
+    PERFORM set_config('vehicles.catalog_changed', '', true);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER vehicles_catalog_version_bump ON vehicles_vehicle;
+
+CREATE TRIGGER vehicles_catalog_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON vehicles_vehicle
+    FOR EACH STATEMENT EXECUTE FUNCTION vehicles_catalog_changed();
+
+CREATE CONSTRAINT TRIGGER vehicles_catalog_version_bump
+    AFTER INSERT ON vehicles_catalogchange
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION vehicles_catalog_version_bump();
+"""
+
+# Back to 0008's statement-level bump
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER vehicles_catalog_version_bump ON vehicles_catalogchange;
+DROP TRIGGER vehicles_catalog_changed ON vehicles_vehicle;
+DROP FUNCTION vehicles_catalog_changed();
+DROP TABLE vehicles_catalogchange;
+
+CREATE OR REPLACE FUNCTION vehicles_catalog_version_bump() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO vehicles_catalogversion AS v (id, version)
+    VALUES (1, (extract(epoch FROM clock_timestamp()) * 1000000)::bigint)
+    ON CONFLICT (id) DO UPDATE SET version = v.version + 1;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER vehicles_catalog_version_bump
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON vehicles_vehicle
+    FOR EACH STATEMENT EXECUTE FUNCTION vehicles_catalog_version_bump();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0008_catalogversion'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+    ]
@@ -1,4 +1,14 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
+
+
+class VehicleManager(models.Manager):
+    def get_queryset(self):
+        # search_vector is only used inside Postgres for ?q= matching and
+        # ranking, so don't ship it to Python with every row
+        return super().get_queryset().defer('search_vector')
 
 
 class Vehicle(models.Model):
@@ -11,14 +21,75 @@ class Vehicle(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
+    # Weighted tsvector over brand/name (A) and description (B), maintained by
+    # a database trigger (see migration 0005)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = VehicleManager()
+
     class Meta:
         indexes = [
             # Composite index for common filter combinations
             models.Index(fields=['brand', 'fuel_type'], name='vehicle_brand_fuel_idx'),
-            # Composite index for price filtering with ordering
-            models.Index(fields=['price', '-created_at'], name='vehicle_price_created_idx'),
-            # Index for ordering by created_at (already has db_index, but composite is better)
+            # Composite index for price filtering/ordering; the id tiebreaker lets
+            # cursor pagination seek straight to a (price, created_at, id) position
+            models.Index(fields=['price', '-created_at', '-id'], name='vehicle_price_created_id_idx'),
+            # Composite index for the default newest-first ordering and its cursor
+            models.Index(fields=['-created_at', '-id'], name='vehicle_created_id_idx'),
+            # Full-text search over brand/name/description
+            GinIndex(fields=['search_vector'], name='vehicle_search_idx'),
+            # Trigram indexes for autocomplete; on UPPER() to match the SQL that
+            # Django generates for istartswith/icontains
+            GinIndex(OpClass(Upper('brand'), name='gin_trgm_ops'), name='vehicle_brand_trgm_idx'),
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='vehicle_name_trgm_idx'),
+        ]
+        constraints = [
+            # Natural key of a catalog entry; import_vehicles upserts on it
+            models.UniqueConstraint(fields=['brand', 'name'], name='vehicle_brand_name_uniq'),
         ]
 
     def __str__(self):
         return f"{self.brand} {self.name}"
+
+
+class VehicleSummary(models.Model):
+    """
+    Rollup of vehicle counts and prices per (brand, fuel_type).
+
+    Maintained by statement-level triggers on vehicles_vehicle (see migration
+    0004), so every insert, update, delete and truncate - including bulk
+    operations that bypass model signals - updates it in the same transaction.
+    Run `manage.py rebuild_vehicle_summary` to recompute it from scratch.
+    """
+    brand = models.CharField(max_length=100)
+    fuel_type = models.CharField(max_length=20)
+    total = models.IntegerField(default=0)
+    price_sum = models.BigIntegerField(default=0)
+    min_price = models.IntegerField(null=True)
+    max_price = models.IntegerField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['brand', 'fuel_type'], name='vehicle_summary_brand_fuel_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.brand} {self.fuel_type}: {self.total}"
+
+
+class CatalogVersion(models.Model):
+    """
+    Single-row counter of catalog changes. Catalog caches (list counts,
+    rendered responses, the autocomplete trie) are keyed on it.
+
+    Triggers on vehicles_vehicle (see migration 0009) bump it once when a
+    writing transaction commits, so every write - from any process, and
+    including bulk operations, COPY and TRUNCATE - invalidates those caches
+    in every process.
+    """
+    ROW_ID = 1
+
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return str(self.version)
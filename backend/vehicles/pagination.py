@@ -0,0 +1,272 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from functools import partial
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .cache import aget_vehicle_count, get_vehicle_count
+
+
+class PrecountedPaginator(DjangoPaginator):
+    """Django paginator that is handed its total instead of running COUNT(*)"""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+
+    @cached_property
+    def count(self):
+        return self._count
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination that can also paginate from async views: the count
+    and the page rows are fetched with the async ORM, with the same results,
+    errors and links as paginate_queryset().
+    """
+
+    async def aget_count(self, queryset, request):
+        return await queryset.acount()
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        count = await self.aget_count(queryset, request)
+        paginator = PrecountedPaginator(queryset, page_size, count=count)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+
+class AsyncPaginationMixin:
+    """GenericAPIView mixin adding apaginate_queryset(), for async list handlers"""
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+
+class VehiclePageNumberPagination(AsyncPageNumberPagination):
+    """
+    Page-number pagination whose total comes from the filter-aware count cache.
+
+    ?count=estimate opts into the planner's row estimate for large result
+    sets; the response then carries an X-Count-Estimated header.
+    """
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        estimate = request.query_params.get(self.count_query_param) == 'estimate'
+        count, self.count_is_estimate = get_vehicle_count(queryset, request.query_params, estimate=estimate)
+        self.django_paginator_class = partial(PrecountedPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def aget_count(self, queryset, request):
+        estimate = request.query_params.get(self.count_query_param) == 'estimate'
+        count, self.count_is_estimate = await aget_vehicle_count(queryset, request.query_params, estimate=estimate)
+        return count
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count_is_estimate:
+            response['X-Count-Estimated'] = 'true'
+        return response
+
+
+class VehicleCursorPagination(BasePagination):
+    """
+    Keyset (seek) pagination for the vehicle list.
+
+    The cursor stores the ordering values of the last row on the page, and the
+    next page is fetched with a WHERE clause that seeks past that position
+    instead of an OFFSET. The queryset ordering must end with a unique column
+    (id) so that every row has a distinct position. No COUNT(*) is issued, so
+    page N costs the same as page 1.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.get_page_queryset(queryset, request)
+        return self.get_page(list(queryset), position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.get_page_queryset(queryset, request)
+        return self.get_page([row async for row in queryset], position, reverse)
+
+    def get_page_queryset(self, queryset, request):
+        """(queryset of the page plus one row, cursor position, reverse)"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.ordering = self.get_ordering(queryset)
+
+        position, reverse = self.decode_cursor(request)
+        ordering = self.invert_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.build_keyset_filter(ordering, position))
+
+        # Fetch one extra row to find out whether another page follows
+        return queryset[:self.page_size + 1], position, reverse
+
+    def get_page(self, results, position, reverse):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        if results:
+            self.first_position = self.get_position(results[0])
+            self.last_position = self.get_position(results[-1])
+        else:
+            self.has_next = self.has_previous = False
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, queryset):
+        ordering = tuple(queryset.query.order_by)
+        if not ordering or ordering[-1].lstrip('-') != 'id':
+            raise AssertionError(
+                'Cursor pagination requires the queryset to be ordered with a '
+                'unique "id" tiebreaker as the last ordering field.'
+            )
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def get_position(self, item):
+        return [getattr(item, field.lstrip('-')) for field in self.ordering]
+
+    @staticmethod
+    def invert_ordering(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    @staticmethod
+    def build_keyset_filter(ordering, position):
+        """
+        Build the WHERE clause selecting rows strictly after `position`.
+
+        For ordering (a, b, id) this expands to
+            a > va OR (a = va AND b > vb) OR (a = va AND b = vb AND id > vid)
+        with > swapped for < on descending fields. The leading column is also
+        bounded on its own (a >= va) so Postgres can use it as an index
+        condition and start the scan at the cursor instead of filtering every
+        row before it.
+        """
+        keyset = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            keyset |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+
+        first = ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': position[0]}) & keyset
+
+    def encode_cursor(self, position, reverse):
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in position]
+        payload = {'p': values}
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            values = payload['p']
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.to_python(field, value) for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, bool(payload.get('r'))
+
+    def to_python(self, field, value):
+        try:
+            model_field = self.model._meta.get_field(field.lstrip('-'))
+        except FieldDoesNotExist:
+            # Annotations such as the search rank round-trip through JSON as-is
+            if not isinstance(value, (int, float)):
+                raise ValueError
+            return value
+        return model_field.to_python(value)
@@ -0,0 +1,14 @@
+import secrets
+
+from django.conf import settings
+
+
+ADMIN_TOKEN_ERROR = 'You are not authorized for this action. Invalid admin token.'
+
+
+def has_admin_token(request):
+    """True if the request carries `Authorization: Bearer <ADMIN_TOKEN>`"""
+    given = request.headers.get('Authorization', '')
+    expected = f'Bearer {settings.ADMIN_TOKEN}'
+    # Constant-time, so response timing doesn't leak how much of the token matched
+    return secrets.compare_digest(given.encode(), expected.encode())
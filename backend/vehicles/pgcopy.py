@@ -0,0 +1,25 @@
+import csv
+import io
+
+
+def copy_rows(cursor, table, columns, rows):
+    """
+    Load `rows` (tuples in `columns` order) into `table` with a single
+    COPY ... FROM STDIN. The rows are encoded as CSV in memory, so callers
+    stream large inputs by copying one chunk at a time.
+
+    `cursor` is a Django cursor; works with both psycopg2 (copy_expert) and
+    psycopg 3 (cursor.copy).
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    sql = f'COPY {table} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)'
+    # Raise Django's database exceptions (IntegrityError, ...) like execute()
+    with cursor.db.wrap_database_errors:
+        if hasattr(cursor, 'copy_expert'):
+            cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
@@ -0,0 +1,131 @@
+from datetime import timezone as dt_timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.settings import ISO_8601, api_settings
+from backend.metrics import track_serialization
+
+
+# Field classes whose to_representation is a no-op for the values the
+# database driver already returns (int, str, bool)
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def datetime_to_iso(value, tz):
+    """Same output as DRF's DateTimeField with the default ISO 8601 format"""
+    if tz is not None:
+        value = value.astimezone(tz)
+    else:
+        value = timezone.make_naive(value, dt_timezone.utc)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+class ReadPlan:
+    """
+    Read-only serializer for list responses.
+
+    The plan is compiled once from a ModelSerializer: every rendered field
+    becomes a column to fetch with values_list() plus a converter that
+    produces the same value the field's to_representation would. Rows are
+    then turned into dicts directly, without instantiating the serializer's
+    field graph or calling into it per field per row.
+
+    `nested` maps a relation field name to (serializer_class, fields) of the
+    related model, which is rendered in place of the primary key (as
+    BookingSerializer does with the vehicle). Its columns are fetched through
+    the relation in the same row.
+    """
+
+    def __init__(self, serializer_class, fields=None, nested=None, prefix='', offset=0):
+        nested = nested or {}
+        self.columns = []
+        # (name, kind, index or nested plan, fallback field)
+        self.entries = []
+
+        for name, field in serializer_class(fields=fields).fields.items():
+            if field.write_only:
+                continue
+            if name in nested:
+                nested_class, nested_fields = nested[name]
+                plan = ReadPlan(
+                    nested_class, nested_fields, prefix=f'{prefix}{name}__',
+                    offset=offset + len(self.columns),
+                )
+                self.entries.append((name, 'nested', plan, None))
+                self.columns.extend(plan.columns)
+                continue
+
+            source = prefix + field.source.replace('.', '__')
+            if isinstance(field, serializers.RelatedField) and not isinstance(
+                field, serializers.PrimaryKeyRelatedField
+            ):
+                raise TypeError(f'Field "{name}" of {serializer_class.__name__} cannot be read from values()')
+            if isinstance(field, PASSTHROUGH_FIELDS):
+                kind = 'value'
+            elif isinstance(field, serializers.DateTimeField) and (
+                getattr(field, 'format', api_settings.DATETIME_FORMAT) or ''
+            ).lower() == ISO_8601 and not hasattr(field, 'timezone'):
+                kind = 'datetime'
+            else:
+                kind = 'field'
+            self.entries.append((name, kind, offset + len(self.columns), field))
+            self.columns.append(source)
+
+    def values(self, queryset):
+        """
+        Fetch the plan's columns as named rows. Ordering columns are appended
+        so cursor pagination can still read each row's position.
+        """
+        extra = [name.lstrip('-') for name in queryset.query.order_by]
+        extra = [name for name in dict.fromkeys(extra) if name not in self.columns]
+        return queryset.values_list(*self.columns, *extra, named=True)
+
+    def serialize(self, rows):
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        with track_serialization():
+            return [self.to_representation(row, tz) for row in rows]
+
+    def iterate(self, rows):
+        """Like serialize(), but lazily, one row at a time, for streaming responses"""
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        return (self.to_representation(row, tz) for row in rows)
+
+    @property
+    def field_names(self):
+        return [name for name, *_ in self.entries]
+
+    def to_representation(self, row, tz):
+        data = {}
+        for name, kind, index, field in self.entries:
+            if kind == 'nested':
+                data[name] = index.to_representation(row, tz)
+                continue
+            value = row[index]
+            if value is None or kind == 'value':
+                data[name] = value
+            elif kind == 'datetime' and value.tzinfo is not None:
+                data[name] = datetime_to_iso(value, tz)
+            else:
+                data[name] = field.to_representation(value)
+        return data
+
+
+@lru_cache(maxsize=256)
+def get_read_plan(serializer_class, fields=None, nested=()):
+    """
+    Cached ReadPlan for a serializer and field selection. `fields` is a tuple
+    of field names or None; `nested` is a tuple of
+    (name, serializer_class, fields) for embedded relations.
+    """
+    nested = {name: (nested_class, nested_fields) for name, nested_class, nested_fields in nested}
+    return ReadPlan(serializer_class, fields, nested)
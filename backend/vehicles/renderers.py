@@ -0,0 +1,40 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from backend.metrics import track_serialization
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson.
+
+    The output is byte-for-byte what JSONRenderer produces with the default
+    settings (compact, UTF-8, U+2028/U+2029 escaped). Indented responses and
+    non-default UNICODE_JSON/COMPACT_JSON settings go through the stock
+    encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with track_serialization():
+            return self.encode(data, accepted_media_type, renderer_context)
+
+    def encode(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Types orjson has no native support for (Decimal, lazy translation
+        # strings, querysets, ...) fall back to DRF's encoder. So do dates,
+        # times and dataclasses, which orjson would format differently (e.g.
+        # "+00:00" instead of "Z", microseconds instead of milliseconds).
+        ret = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+        )
+
+        # Match JSONRenderer's escaping of the two JSON line terminators that
+        # are not valid inside JavaScript strings
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
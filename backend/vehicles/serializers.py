@@ -2,7 +2,28 @@ from rest_framework import serializers
 from .models import Vehicle
 
 
-class VehicleSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Serializer mixin that renders only the field names given in a `fields`
+    argument (None renders every field).
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_renderable_fields(cls):
+        """Names of every field the serializer can render"""
+        if '_renderable_fields' not in cls.__dict__:
+            cls._renderable_fields = list(cls().fields)
+        return cls._renderable_fields
+
+
+class VehicleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Vehicle
-        fields = '__all__'
+        exclude = ('search_vector',)
@@ -0,0 +1,6 @@
+from .cache import catalog_changed
+
+
+def invalidate_catalog_cache(sender, **kwargs):
+    """Pin reads to the primary whenever a vehicle is saved or deleted"""
+    catalog_changed()
@@ -0,0 +1,74 @@
+from django.db import connection, transaction
+
+from .models import Vehicle, VehicleSummary
+
+
+def build_vehicle_summary(rows):
+    """
+    Fold (brand, fuel_type) rollup rows into one entry per brand, with a
+    per-fuel breakdown and price statistics. Rows must be ordered by brand.
+    """
+    summary = []
+    entry = None
+    for row in rows:
+        if entry is None or entry['brand'] != row.brand:
+            entry = {
+                'brand': row.brand,
+                'total': 0,
+                'fuel_types': {},
+                'min_price': row.min_price,
+                'max_price': row.max_price,
+                'avg_price': None,
+                '_price_sum': 0,
+            }
+            summary.append(entry)
+        entry['total'] += row.total
+        entry['fuel_types'][row.fuel_type] = row.total
+        entry['min_price'] = min(entry['min_price'], row.min_price)
+        entry['max_price'] = max(entry['max_price'], row.max_price)
+        entry['_price_sum'] += row.price_sum
+
+    for entry in summary:
+        entry['avg_price'] = round(entry.pop('_price_sum') / entry['total'])
+    return summary
+
+
+def vehicle_summary_rows():
+    return VehicleSummary.objects.filter(total__gt=0).order_by('brand', 'fuel_type')
+
+
+def get_vehicle_summary():
+    """Per-brand vehicle summary read from the rollup table, O(brands x fuel types)"""
+    return build_vehicle_summary(vehicle_summary_rows())
+
+
+def rebuild_vehicle_summary():
+    """
+    Recompute the rollup table from vehicles_vehicle.
+
+    Vehicle writes are blocked (SHARE lock) for the duration so the rebuilt
+    totals can't miss a concurrent insert or delete; reads carry on as normal.
+    Returns the number of (brand, fuel_type) rows that had drifted.
+    """
+    vehicle_table = Vehicle._meta.db_table
+    summary_table = VehicleSummary._meta.db_table
+    columns = ('brand', 'fuel_type', 'total', 'price_sum', 'min_price', 'max_price')
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {vehicle_table} IN SHARE MODE')
+
+            cursor.execute(f'SELECT {", ".join(columns)} FROM {summary_table}')
+            before = set(cursor.fetchall())
+
+            cursor.execute(f'DELETE FROM {summary_table}')
+            cursor.execute(
+                f'INSERT INTO {summary_table} ({", ".join(columns)}) '
+                f'SELECT brand, fuel_type, count(*), sum(price), min(price), max(price) '
+                f'FROM {vehicle_table} GROUP BY brand, fuel_type'
+            )
+
+            cursor.execute(f'SELECT {", ".join(columns)} FROM {summary_table}')
+            after = set(cursor.fetchall())
+
+    return len({row[:2] for row in before ^ after})
@@ -0,0 +1,222 @@
+"""
+Deterministic synthetic catalog, booking and bookmark data for load and
+capacity testing (see `manage.py seed_vehicles --synthetic`).
+
+Every batch is generated from its own RNG seeded with (seed, table, batch
+number), so the output is identical for a given seed no matter how the
+batches are spread over worker threads.
+"""
+import base64
+import hashlib
+import math
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connection
+
+from .pgcopy import copy_rows
+
+
+# (brand, market share weight, models, fuel type weights, median price, price spread)
+BRANDS = [
+    ('Maruti Suzuki', 40, ['Swift', 'Baleno', 'Dzire', 'Brezza', 'Ertiga', 'WagonR', 'Grand Vitara'],
+     {'Petrol': 85, 'Diesel': 10, 'Electric': 5}, 850000, 0.30),
+    ('Hyundai', 15, ['i20', 'Creta', 'Venue', 'Verna', 'Alcazar', 'Ioniq 5'],
+     {'Petrol': 55, 'Diesel': 40, 'Electric': 5}, 1300000, 0.35),
+    ('Tata', 14, ['Nexon', 'Punch', 'Harrier', 'Safari', 'Tiago', 'Altroz'],
+     {'Petrol': 45, 'Diesel': 30, 'Electric': 25}, 1100000, 0.40),
+    ('Mahindra', 10, ['Thar', 'Scorpio N', 'XUV700', 'XUV 3XO', 'Bolero'],
+     {'Petrol': 25, 'Diesel': 70, 'Electric': 5}, 1600000, 0.35),
+    ('Toyota', 6, ['Innova Hycross', 'Fortuner', 'Camry', 'Glanza', 'Hyryder'],
+     {'Petrol': 55, 'Diesel': 40, 'Electric': 5}, 2200000, 0.45),
+    ('Honda', 4, ['City', 'Amaze', 'Elevate', 'Civic', 'Accord'],
+     {'Petrol': 90, 'Diesel': 5, 'Electric': 5}, 1400000, 0.35),
+    ('Kia', 5, ['Seltos', 'Sonet', 'Carens', 'EV6'],
+     {'Petrol': 50, 'Diesel': 42, 'Electric': 8}, 1500000, 0.40),
+    ('Ford', 2, ['Mustang', 'F-150', 'Endeavour', 'EcoSport'],
+     {'Petrol': 50, 'Diesel': 50}, 2800000, 0.45),
+    ('BMW', 2, ['3 Series', '5 Series', 'X1', 'X5', 'i4', 'iX'],
+     {'Petrol': 50, 'Diesel': 30, 'Electric': 20}, 6500000, 0.35),
+    ('Mercedes-Benz', 1.5, ['C-Class', 'E-Class', 'GLA', 'GLE', 'EQS'],
+     {'Petrol': 50, 'Diesel': 35, 'Electric': 15}, 7500000, 0.40),
+    ('Tesla', 0.5, ['Model 3', 'Model Y', 'Model S', 'Model X'],
+     {'Electric': 100}, 6000000, 0.30),
+]
+TRIMS = ['Base', 'LX', 'EX', 'Sport', 'Plus', 'Premium', 'Signature', 'Limited']
+BODY_STYLES = ['hatchback', 'sedan', 'compact SUV', 'SUV', 'MPV', 'coupe']
+FEATURES = [
+    'a touchscreen infotainment system', 'six airbags', 'adaptive cruise control', 'a panoramic sunroof',
+    'ventilated seats', 'wireless charging', 'a 360-degree camera', 'connected car features',
+    'lane keep assist', 'a premium sound system',
+]
+IMAGE_URLS = [
+    'https://images.unsplash.com/photo-1549317661-bd32c8ce0db2?w=800',
+    'https://images.unsplash.com/photo-1552519507-da3b142c6e3d?w=800',
+    'https://images.unsplash.com/photo-1555215695-3004980ad54e?w=800',
+    'https://images.unsplash.com/photo-1560958089-b8a1929cea89?w=800',
+    'https://images.unsplash.com/photo-1606664515524-ed2f786a0bd6?w=800',
+    'https://images.unsplash.com/photo-1617531653332-bd46c24f2068?w=800',
+]
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Ananya', 'Diya', 'Ishaan', 'Kavya', 'Priya', 'Rohan', 'Sara', 'Arjun', 'Meera']
+LAST_NAMES = ['Sharma', 'Patel', 'Reddy', 'Iyer', 'Singh', 'Khan', 'Gupta', 'Nair', 'Das', 'Mehta']
+
+# Items per token follow a Pareto distribution (alpha ~1.16 is the 80/20
+# rule): most guests book or bookmark one or two vehicles, a few hundreds.
+TOKEN_ALPHA = 1.16
+MAX_ITEMS_PER_TOKEN = 200
+# Vehicle popularity skew for bookings/bookmarks (higher is more skewed)
+POPULARITY_SKEW = 2.0
+HISTORY_DAYS = 3 * 365
+
+VEHICLE_COLUMNS = ('brand', 'name', 'price', 'fuel_type', 'image_url', 'description', 'created_at')
+BOOKING_COLUMNS = ('vehicle_id', 'customer_name', 'customer_email', 'booking_token', 'created_at')
+BOOKMARK_COLUMNS = ('vehicle_id', 'bookmark_token', 'created_at')
+
+
+def get_rng(seed, table, batch):
+    return random.Random(f'{seed}:{table}:{batch}')
+
+
+def make_token(seed, kind, batch, index):
+    """Deterministic stand-in for secrets.token_urlsafe(32)"""
+    digest = hashlib.sha256(f'{seed}:{kind}:{batch}:{index}'.encode()).digest()
+    return base64.urlsafe_b64encode(digest).decode()[:43]
+
+
+def random_timestamp(rng, now):
+    # `now` is a fixed reference time (not the clock) so runs are repeatable
+    return now - timedelta(seconds=rng.random() * HISTORY_DAYS * 86400)
+
+
+def pick_vehicle(rng, vehicle_ids):
+    return vehicle_ids[int(len(vehicle_ids) * rng.random() ** POPULARITY_SKEW)]
+
+
+def token_group_size(rng):
+    return min(MAX_ITEMS_PER_TOKEN, int(rng.paretovariate(TOKEN_ALPHA)))
+
+
+def vehicle_rows(seed, batch, start, count, now):
+    """Vehicles number start .. start + count - 1"""
+    rng = get_rng(seed, 'vehicles', batch)
+    weights = [brand[1] for brand in BRANDS]
+    rows = []
+    for index in range(start, start + count):
+        brand, _, models, fuel_weights, median, spread = rng.choices(BRANDS, weights)[0]
+        model = rng.choice(models)
+        fuel_type = rng.choices(list(fuel_weights), list(fuel_weights.values()))[0]
+        price = max(300000, int(round(rng.lognormvariate(math.log(median), spread), -3)))
+        description = (
+            f'{rng.choice(["Well-equipped", "Practical", "Spacious", "Sporty", "Efficient"])} '
+            f'{fuel_type.lower()} {rng.choice(BODY_STYLES)} with {rng.choice(FEATURES)} '
+            f'and {rng.choice(FEATURES)}.'
+        )
+        rows.append((
+            brand,
+            # (brand, name) is unique; the suffix keeps generated models apart
+            f'{model} {rng.choice(TRIMS)} S{seed}-{index}',
+            price,
+            fuel_type,
+            rng.choice(IMAGE_URLS),
+            description,
+            random_timestamp(rng, now),
+        ))
+    return rows
+
+
+def booking_rows(seed, batch, count, vehicle_ids, now):
+    rng = get_rng(seed, 'bookings', batch)
+    rows = []
+    token_index = 0
+    while len(rows) < count:
+        token = make_token(seed, 'booking', batch, token_index)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f'{first}.{last}.{batch}.{token_index}@example.com'.lower()
+        for _ in range(min(token_group_size(rng), count - len(rows))):
+            rows.append((pick_vehicle(rng, vehicle_ids), f'{first} {last}', email, token, random_timestamp(rng, now)))
+        token_index += 1
+    return rows
+
+
+def bookmark_rows(seed, batch, count, vehicle_ids, now):
+    rng = get_rng(seed, 'bookmarks', batch)
+    rows = []
+    token_index = 0
+    while len(rows) < count:
+        token = make_token(seed, 'bookmark', batch, token_index)
+        # (bookmark_token, vehicle) is unique, so draw distinct vehicles
+        size = min(token_group_size(rng), count - len(rows), len(vehicle_ids))
+        picked = set()
+        while len(picked) < size:
+            picked.add(pick_vehicle(rng, vehicle_ids))
+        rows.extend((vehicle_id, token, random_timestamp(rng, now)) for vehicle_id in sorted(picked))
+        token_index += 1
+    return rows
+
+
+def split_batches(total, batch_size):
+    """(batch number, first row, row count) for every batch"""
+    return [
+        (batch, start, min(batch_size, total - start))
+        for batch, start in enumerate(range(0, total, batch_size))
+    ]
+
+
+def existing_tables(seed, vehicle_batches, booking_batches, bookmark_batches):
+    """
+    Which of vehicles/bookings/bookmarks already hold rows generated for
+    `seed` in these batches, by an earlier or interrupted run. Vehicle names
+    carry the seed, and every booking and bookmark batch starts with its
+    token number 0, so a committed batch is found by its first token.
+    """
+    checks = []
+    if vehicle_batches:
+        checks.append(('vehicles', 'SELECT EXISTS (SELECT 1 FROM vehicles_vehicle WHERE name LIKE %s)', f'% S{seed}-%'))
+    if booking_batches:
+        checks.append((
+            'bookings', 'SELECT EXISTS (SELECT 1 FROM bookings_booking WHERE booking_token = ANY(%s))',
+            [make_token(seed, 'booking', batch, 0) for batch, _, _ in booking_batches],
+        ))
+    if bookmark_batches:
+        checks.append((
+            'bookmarks', 'SELECT EXISTS (SELECT 1 FROM bookmarks_bookmark WHERE bookmark_token = ANY(%s))',
+            [make_token(seed, 'bookmark', batch, 0) for batch, _, _ in bookmark_batches],
+        ))
+
+    existing = []
+    with connection.cursor() as cursor:
+        for kind, sql, param in checks:
+            cursor.execute(sql, [param])
+            if cursor.fetchone()[0]:
+                existing.append(kind)
+    return existing
+
+
+def copy_in_parallel(table, columns, batches, make_rows, workers, progress=None):
+    """
+    Generate and COPY batches on `workers` threads, each with its own
+    database connection. Every COPY commits on its own.
+    """
+    lock = threading.Lock()
+    loaded = [0]
+
+    def work(assigned):
+        try:
+            for batch in assigned:
+                rows = make_rows(batch)
+                with connection.cursor() as cursor:
+                    copy_rows(cursor, table, columns, rows)
+                with lock:
+                    loaded[0] += len(rows)
+                    if progress:
+                        progress(loaded[0])
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(work, batches[i::workers]) for i in range(workers)]
+        for future in futures:
+            future.result()
+    return loaded[0]
@@ -1,3 +1,466 @@
-from django.test import TestCase
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from io import StringIO
+from itertools import count
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import SimpleTestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from bookings.models import Booking
+from bookmarks.models import Bookmark
+from .autocomplete import PrefixTrie, _trie_state
+from .cache import expire_catalog_version, get_catalog_version, get_vehicle_count
+from .catalog import CATALOG, sync_catalog
+from .deletion import truncate_vehicles
+from .models import CatalogVersion, Vehicle
+from .read_plans import get_read_plan
+from .renderers import ORJSONRenderer
+from .serializers import VehicleSerializer
+
+
+_model_numbers = count(1)
+
+
+def create_vehicles(number, brand='Toyota', fuel_type='Petrol', price=20000):
+    return Vehicle.objects.bulk_create(
+        Vehicle(
+            brand=brand,
+            # (brand, name) is unique
+            name=f'Model {next(_model_numbers)}',
+            price=price + i,
+            fuel_type=fuel_type,
+            image_url='https://example.com/car.jpg',
+            description='A car',
+        )
+        for i in range(number)
+    )
+
+
+def run_deferred_triggers():
+    """Fire the deferred triggers, e.g. the catalog version bump, that committing would"""
+    with connection.cursor() as cursor:
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+
+
+def commit_catalog():
+    """What committing a catalog write outside the API does, once the cached version expires"""
+    run_deferred_triggers()
+    expire_catalog_version()
+
+
+class CursorPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        for price in (300, 100, 200, 100, 300, 100, 200):
+            create_vehicles(1, brand=f'Brand {Vehicle.objects.count()}', price=price)
+        # Equal prices and timestamps leave only the id to break ties
+        Vehicle.objects.update(created_at=datetime(2026, 1, 1, tzinfo=timezone.utc))
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([vehicle['id'] for vehicle in response.json()['results']])
+            url = response.json()[link]
+        return pages
+
+    def test_round_trip(self):
+        for ordering, fields in [
+            ('price', ('price', '-created_at', '-id')),
+            ('-price', ('-price', 'created_at', 'id')),
+            ('-created_at', ('-created_at', '-id')),
+        ]:
+            with self.subTest(ordering=ordering):
+                expected = list(Vehicle.objects.order_by(*fields).values_list('id', flat=True))
+                pages = self.walk(f'/api/vehicles?pagination=cursor&page_size=2&ordering={ordering}', 'next')
+                self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+                self.assertEqual([pk for page in pages for pk in page], expected)
+
+                # Walking back from the last page returns the same pages
+                last = self.client.get(
+                    f'/api/vehicles?pagination=cursor&page_size=2&ordering={ordering}'
+                )
+                url = last.json()['next']
+                while True:
+                    response = self.client.get(url).json()
+                    if not response['next']:
+                        break
+                    url = response['next']
+                back = self.walk(response['previous'], 'previous')
+                self.assertEqual(back, pages[-2::-1])
+
+    def test_no_count_query(self):
+        response = self.client.get('/api/vehicles?pagination=cursor')
+        self.assertNotIn('count', response.json())
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/vehicles?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class VehicleCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        create_vehicles(3)
+
+    def test_count_cache_invalidated_by_writes(self):
+        params = {'brand': 'Honda'}
+        queryset = Vehicle.objects.filter(brand='Honda')
+        self.assertEqual(get_vehicle_count(queryset, params), (0, False))
+        create_vehicles(2, brand='Honda')
+        commit_catalog()
+        self.assertEqual(get_vehicle_count(queryset, params), (2, False))
+        self.assertEqual(self.client.get('/api/vehicles?brand=Honda').json()['count'], 2)
+
+    @override_settings(VEHICLE_COUNT_ESTIMATE_THRESHOLD=0)
+    def test_estimated_count(self):
+        response = self.client.get('/api/vehicles?count=estimate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Count-Estimated'], 'true')
+        self.assertIsInstance(response.json()['count'], int)
+
+    def test_small_estimate_is_counted_exactly(self):
+        response = self.client.get('/api/vehicles?count=estimate')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Count-Estimated', response)
+        self.assertEqual(response.json()['count'], 3)
+
+
+class CatalogVersionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.vehicles = create_vehicles(3)
+        commit_catalog()
+
+    def stored_version(self):
+        return CatalogVersion.objects.get(pk=CatalogVersion.ROW_ID).version
+
+    def test_bumped_once_per_transaction_on_commit(self):
+        version = self.stored_version()
+        Vehicle.objects.filter(pk=self.vehicles[0].pk).update(price=1)
+        create_vehicles(2, brand='Honda')
+        self.assertEqual(self.stored_version(), version)
+        run_deferred_triggers()
+        self.assertEqual(self.stored_version(), version + 1)
+        truncate_vehicles()
+        run_deferred_triggers()
+        self.assertEqual(self.stored_version(), version + 2)
+
+    def test_not_modified(self):
+        response = self.client.get('/api/vehicles')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get('/api/vehicles', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_repeat_hits_skip_the_database(self):
+        etag = self.client.get('/api/vehicles')['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/vehicles', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get('/api/vehicles').status_code, 200)
+
+    def test_save_expires_the_cached_version_on_commit(self):
+        url = f'/api/vehicles/{self.vehicles[0].pk}'
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vehicles[0].price = 123
+            self.vehicles[0].save()
+            run_deferred_triggers()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['price'], 123)
+
+    def test_write_without_signals_invalidates_cached_responses(self):
+        url = f'/api/vehicles/{self.vehicles[0].pk}'
+        etag = self.client.get(url)['ETag']
+
+        # Bulk updates (like seed/import/clear commands) send no model signals
+        Vehicle.objects.filter(pk=self.vehicles[0].pk).update(price=123)
+        run_deferred_triggers()
+        # Served from the cached version until it expires
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        expire_catalog_version()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['price'], 123)
+
+
+class PrefixTrieTests(SimpleTestCase):
+    suggestions = [
+        ('Toyota', 5, ('Toyota',)),
+        ('Tata', 3, ('Tata',)),
+        ('Honda', 1, ('Honda',)),
+    ]
+
+    def test_lookup(self):
+        trie = PrefixTrie.build(self.suggestions, depth=3, limit=5)
+        self.assertEqual(trie.lookup('t', 5), ['Toyota', 'Tata'])
+        self.assertEqual(trie.lookup('TA', 5), ['Tata'])
+        self.assertEqual(trie.lookup('x', 5), [])
+        # Deeper than the trie, or more than it keeps per node
+        self.assertIsNone(trie.lookup('toyo', 5))
+        self.assertIsNone(trie.lookup('t', 6))
+
+    def test_incomplete_trie_only_answers_full_prefixes(self):
+        trie = PrefixTrie.build(self.suggestions, depth=3, limit=5, complete=False)
+        self.assertEqual(trie.lookup('t', 1), ['Toyota'])
+        self.assertIsNone(trie.lookup('t', 5))
+        self.assertIsNone(trie.lookup('x', 5))
+
+
+class AutocompleteTests(APITestCase):
+    def setUp(self):
+        _trie_state.update(version=None, trie=None, checked=0.0)
+        cache.clear()
+        create_vehicles(3, brand='Toyota')
+        create_vehicles(1, brand='Tata')
+
+    def suggest(self, prefix):
+        response = self.client.get('/api/vehicles/autocomplete', {'prefix': prefix})
+        self.assertEqual(response.status_code, 200)
+        return [(s['type'], s['value']) for s in response.json()['suggestions']]
+
+    def test_answered_from_trie(self):
+        self.assertEqual(self.suggest('t')[:2], [('brand', 'Toyota'), ('brand', 'Tata')])
+        # Hot prefixes touch neither the database nor the version cache
+        with self.assertNumQueries(0), mock.patch('vehicles.autocomplete.get_catalog_version') as version:
+            self.suggest('ta')
+        version.assert_not_called()
+
+    @override_settings(AUTOCOMPLETE_TRIE_MAX_TERMS=1)
+    def test_truncated_trie_falls_back_to_database(self):
+        self.assertIn(('brand', 'Tata'), self.suggest('t'))
+
+    @override_settings(AUTOCOMPLETE_TRIE_CHECK_SECONDS=0)
+    def test_trie_rebuilt_after_catalog_change(self):
+        self.assertEqual(self.suggest('h'), [])
+        create_vehicles(1, brand='Honda')
+        commit_catalog()
+        self.assertEqual(self.suggest('h')[0], ('brand', 'Honda'))
+
+    def test_version_checked_once_per_interval(self):
+        self.suggest('h')
+        create_vehicles(1, brand='Honda')
+        commit_catalog()
+        self.assertEqual(self.suggest('h'), [])
+        _trie_state['checked'] -= settings.AUTOCOMPLETE_TRIE_CHECK_SECONDS
+        self.assertEqual(self.suggest('h')[0], ('brand', 'Honda'))
+
+
+class SyncCatalogTests(APITestCase):
+    entries = [
+        {'brand': 'Tata', 'name': 'Nexon', 'price': 800000, 'fuel_type': 'Petrol',
+         'image_url': 'https://example.com/nexon.jpg', 'description': 'Compact SUV'},
+        {'brand': 'Tata', 'name': 'Punch', 'price': 600000, 'fuel_type': 'Petrol',
+         'image_url': 'https://example.com/punch.jpg', 'description': 'Micro SUV'},
+    ]
+
+    def test_inserts_missing_entries_only(self):
+        created, updated, deleted = sync_catalog(self.entries)
+        self.assertEqual([v.name for v in created], ['Nexon', 'Punch'])
+        self.assertEqual((updated, deleted), ([], 0))
+
+        created, updated, deleted = sync_catalog(self.entries)
+        self.assertEqual((created, updated, deleted), ([], [], 0))
+
+    def test_updates_changed_entries(self):
+        sync_catalog(self.entries)
+        changed = [dict(self.entries[0], price=850000), self.entries[1]]
+
+        created, updated, _ = sync_catalog(changed, update=False)
+        self.assertEqual((created, updated), ([], []))
+        self.assertEqual(Vehicle.objects.get(name='Nexon').price, 800000)
+
+        created, updated, _ = sync_catalog(changed)
+        self.assertEqual([v.name for v in updated], ['Nexon'])
+        self.assertEqual(Vehicle.objects.get(name='Nexon').price, 850000)
+
+    def test_deletes_other_vehicles_without_the_collector(self):
+        sync_catalog(self.entries)
+        other = create_vehicles(3, brand='Honda')
+        Booking.objects.create(vehicle=other[0], customer_name='A', customer_email='a@example.com')
+        Bookmark.objects.create(vehicle=other[1])
+        Bookmark.objects.create(vehicle=Vehicle.objects.get(name='Nexon'))
+
+        deleted_signals = []
+
+        def receiver(instance, **kwargs):
+            deleted_signals.append(instance)
+
+        post_delete.connect(receiver, sender=Vehicle)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Vehicle)
+
+        _, _, deleted = sync_catalog(self.entries, delete=True)
+        self.assertEqual(deleted, 3)
+        self.assertEqual(deleted_signals, [])
+        self.assertQuerySetEqual(Vehicle.objects.order_by('name').values_list('name', flat=True), ['Nexon', 'Punch'])
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(Bookmark.objects.count(), 1)
+
+    def test_sample_catalog_has_unique_keys(self):
+        keys = [(entry['brand'], entry['name']) for entry in CATALOG]
+        self.assertEqual(len(keys), len(set(keys)))
+
+
+class FacetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        for brand, fuel_type, price in [
+            ('Tata', 'Petrol', 500),
+            ('Tata', 'Diesel', 1500),
+            ('Honda', 'Petrol', 1500),
+            ('Honda', 'Electric', 2500),
+        ]:
+            create_vehicles(1, brand=brand, fuel_type=fuel_type, price=price)
+
+    def facets(self, query=''):
+        with self.settings(VEHICLE_PRICE_BUCKETS=[0, 1000, 2000]):
+            response = self.client.get(f'/api/vehicles/facets{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    @staticmethod
+    def counts(items):
+        return {item['value']: item['count'] for item in items}
+
+    @staticmethod
+    def bucket_counts(facets):
+        return [(bucket['min'], bucket['max'], bucket['count']) for bucket in facets['price']['buckets']]
+
+    def test_unfiltered(self):
+        facets = self.facets()
+        self.assertEqual(facets['total'], 4)
+        self.assertEqual(self.counts(facets['brands']), {'Honda': 2, 'Tata': 2})
+        self.assertEqual(self.counts(facets['fuel_types']), {'Diesel': 1, 'Electric': 1, 'Petrol': 2})
+        self.assertEqual(self.bucket_counts(facets), [(0, 1000, 1), (1000, 2000, 2), (2000, None, 1)])
+        self.assertEqual((facets['price']['min'], facets['price']['max']), (500, 2500))
+
+    def test_each_facet_ignores_its_own_filter(self):
+        facets = self.facets('?brand=Tata&fuel_type=Petrol')
+        self.assertEqual(facets['total'], 1)
+        # Brands under the fuel filter only, fuel types under the brand filter only
+        self.assertEqual(self.counts(facets['brands']), {'Honda': 1, 'Tata': 1})
+        self.assertEqual(self.counts(facets['fuel_types']), {'Diesel': 1, 'Petrol': 1})
+        self.assertEqual(self.bucket_counts(facets), [(0, 1000, 1), (1000, 2000, 0), (2000, None, 0)])
+
+    def test_price_filter(self):
+        facets = self.facets('?min_price=1000')
+        self.assertEqual(facets['total'], 3)
+        self.assertEqual(self.counts(facets['brands']), {'Honda': 2, 'Tata': 1})
+        # The histogram and price range ignore the price filter
+        self.assertEqual(self.bucket_counts(facets), [(0, 1000, 1), (1000, 2000, 2), (2000, None, 1)])
+        self.assertEqual((facets['price']['min'], facets['price']['max']), (500, 2500))
+
+
+class ReadPlanTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        vehicles = create_vehicles(3, brand='Škoda')
+        Vehicle.objects.filter(pk=vehicles[1].pk).update(description='Quotes " and \\ and\nnewlines')
+
+    def test_output_matches_serializer(self):
+        queryset = Vehicle.objects.order_by('-created_at', '-id')
+        for fields in (None, ('id', 'brand', 'price'), ('created_at',)):
+            with self.subTest(fields=fields):
+                plan = get_read_plan(VehicleSerializer, fields)
+                self.assertEqual(
+                    ORJSONRenderer().render(plan.serialize(plan.values(queryset))),
+                    JSONRenderer().render(VehicleSerializer(queryset, many=True, fields=fields).data),
+                )
+
+    def test_list_response_matches_serializer(self):
+        response = self.client.get('/api/vehicles?fields=id,name,created_at')
+        queryset = Vehicle.objects.order_by('-created_at', '-id')
+        self.assertEqual(
+            response.json()['results'],
+            VehicleSerializer(queryset, many=True, fields=('id', 'name', 'created_at')).data,
+        )
+
+
+class RendererTests(SimpleTestCase):
+    def test_matches_json_renderer(self):
+        data = [{
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'created_at': datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+            'naive': datetime(2026, 1, 2, 3, 4, 5),
+            'date': date(2026, 1, 2),
+            'time': time(3, 4, 5, 678901),
+            'price': Decimal('1.50'),
+            'name': 'Line\u2028separator',
+            1: None,
+        }]
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class ClearVehiclesTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        honda = create_vehicles(5, brand='Honda')
+        toyota = create_vehicles(2, brand='Toyota')
+        for vehicle in (honda[0], honda[4], toyota[0]):
+            Booking.objects.create(vehicle=vehicle, customer_name='A', customer_email='a@example.com')
+            Bookmark.objects.create(vehicle=vehicle)
+
+    def clear(self, *args):
+        out = StringIO()
+        call_command('clear_vehicles', '--confirm', *args, stdout=out)
+        return out.getvalue()
+
+    def test_batched_brand_delete(self):
+        version = get_catalog_version()
+        output = self.clear('--brand', 'Honda', '--batch-size', '2')
+        commit_catalog()
+
+        progress = [line for line in output.splitlines() if line.startswith('Deleted')]
+        self.assertEqual(
+            [line.split(',')[0] for line in progress],
+            ['Deleted 2/5 vehicle(s)', 'Deleted 4/5 vehicle(s)', 'Deleted 5/5 vehicle(s)'],
+        )
+        self.assertIn('2 bookings', progress[-1])
+        self.assertIn('2 bookmarks', progress[-1])
+        self.assertQuerySetEqual(Vehicle.objects.values_list('brand', flat=True).distinct(), ['Toyota'])
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(Bookmark.objects.count(), 1)
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_full_truncate(self):
+        # TRUNCATE refuses to run while the test transaction's deferred FK
+        # checks on the rows created in setUp are pending
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        self.assertIn('Successfully deleted 7 vehicle(s)', self.clear())
+        self.assertFalse(Vehicle.objects.exists())
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(Bookmark.objects.exists())
+
+    def test_nothing_to_delete(self):
+        self.assertIn('No vehicles found', self.clear('--brand', 'Tesla'))
+        self.assertEqual(Vehicle.objects.count(), 7)
+
+
+class MetricsTests(APITestCase):
+    def test_requires_admin_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {settings.ADMIN_TOKEN}')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'http_request_duration_seconds', response.content)
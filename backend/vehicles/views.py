@@ -2,67 +2,210 @@ from rest_framework.generics import ListCreateAPIView, RetrieveAPIView
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Count
 from django.conf import settings
+from django.contrib.postgres.search import SearchRank
+from django.db import router
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from django.shortcuts import aget_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_GET
 from .models import Vehicle
+from .cache import cache_catalog_response
+from .autocomplete import get_suggestions
+from .export import get_export_format, invalid_format_response, streaming_export
+from .facets import get_vehicle_facets
+from .fieldsets import Fieldset
+from .filters import filter_vehicles, get_search_query
+from .pagination import AsyncPaginationMixin, VehicleCursorPagination, VehiclePageNumberPagination
+from .permissions import ADMIN_TOKEN_ERROR, has_admin_token
+from .read_plans import get_read_plan
 from .serializers import VehicleSerializer
+from .summary import get_vehicle_summary
 
 
-class VehicleListCreateView(ListCreateAPIView):
+# Supported ?ordering= values. Each ordering ends with a unique tiebreaker so
+# rows with equal keys come back in a stable order (required by the cursor
+# mode) and matches a composite index on Vehicle.
+VEHICLE_ORDERINGS = {
+    '-created_at': ('-created_at', '-id'),
+    'price': ('price', '-created_at', '-id'),
+    '-price': ('-price', 'created_at', 'id'),
+    # Only available with ?q=, where it is also the default
+    'relevance': ('-rank', '-created_at', '-id'),
+}
+DEFAULT_VEHICLE_ORDERING = '-created_at'
+
+
+@method_decorator(cache_catalog_response, name='dispatch')
+class VehicleListCreateView(AsyncPaginationMixin, ListCreateAPIView):
     serializer_class = VehicleSerializer
+    pagination_class = VehiclePageNumberPagination
+
+    @property
+    def paginator(self):
+        """
+        Use keyset pagination when the client asks for it with
+        ?pagination=cursor (or is following a cursor link). Otherwise keep the
+        default page-number pagination.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or VehicleCursorPagination.cursor_query_param in params:
+                self._paginator = VehicleCursorPagination()
+        return super().paginator
 
     def get_queryset(self):
-        qs = Vehicle.objects.all()
-
-        brand = self.request.query_params.get('brand')
-        fuel = self.request.query_params.get('fuel_type')
-        min_price = self.request.query_params.get('min_price')
-        max_price = self.request.query_params.get('max_price')
-
-        if brand:
-            qs = qs.filter(brand=brand)
-        if fuel:
-            qs = qs.filter(fuel_type=fuel)
-        if min_price:
-            try:
-                qs = qs.filter(price__gte=int(min_price))
-            except (ValueError, TypeError):
-                pass  # Ignore invalid price values
-        if max_price:
-            try:
-                qs = qs.filter(price__lte=int(max_price))
-            except (ValueError, TypeError):
-                pass  # Ignore invalid price values
-
-        return qs.order_by('-created_at')
+        params = self.request.query_params
+        qs = filter_vehicles(Vehicle.objects.all(), params)
+
+        ordering = params.get('ordering')
+        search = params.get('q', '').strip()
+        if search:
+            # Rank matches with ts_rank over the stored, weighted search_vector.
+            # ts_rank returns real; cast it so the value survives a round trip
+            # through a pagination cursor exactly.
+            rank = SearchRank(F('search_vector'), get_search_query(search))
+            qs = qs.annotate(rank=Cast(rank, FloatField()))
+            ordering = ordering or 'relevance'
+        elif ordering == 'relevance':
+            ordering = None
+
+        ordering = VEHICLE_ORDERINGS.get(ordering, VEHICLE_ORDERINGS[DEFAULT_VEHICLE_ORDERING])
+        qs = qs.order_by(*ordering)
+
+        fields = self.get_rendered_fields()
+        if fields is not None:
+            # Only fetch the selected columns, plus the ordering columns that
+            # cursor pagination reads back from each row
+            columns = {name.lstrip('-') for name in ordering} - {'rank'}
+            qs = qs.only(*fields, *columns)
+        return qs
+
+    def get_rendered_fields(self):
+        """Field names selected with ?fields=/?omit=, or None for all"""
+        fieldset = Fieldset.from_request(self.request)
+        if not fieldset.is_restricted:
+            return None
+        return fieldset.select(VehicleSerializer.get_renderable_fields())
+
+    def list(self, request, *args, **kwargs):
+        # JSON responses are built from values_list() rows by a read plan;
+        # the browsable API keeps the regular serializer (it needs it for
+        # the forms anyway)
+        if request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+
+        plan, queryset = self.get_planned_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.serialize(page))
+        return Response(plan.serialize(queryset))
+
+    async def alist(self, request, *args, **kwargs):
+        """JSON list() with the async ORM, for the ASGI read path"""
+        plan, queryset = self.get_planned_queryset()
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.serialize(page))
+        return Response(plan.serialize([row async for row in queryset]))
+
+    def get_planned_queryset(self):
+        """(read plan, values_list() queryset) for JSON list responses"""
+        fields = self.get_rendered_fields()
+        plan = get_read_plan(VehicleSerializer, None if fields is None else tuple(fields))
+        return plan, plan.values(self.filter_queryset(self.get_queryset()))
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == 'GET':
+            kwargs.setdefault('fields', self.get_rendered_fields())
+        return super().get_serializer(*args, **kwargs)
 
     def create(self, request):
         """
         Create a new vehicle. Requires admin token in Authorization header.
         Header format: Authorization: Bearer <ADMIN_TOKEN>
         """
-        auth_header = request.headers.get('Authorization', '')
-        expected_token = f'Bearer {settings.ADMIN_TOKEN}'
-        
-        if auth_header != expected_token:
-            return Response(
-                {'detail': 'You are not authorized for this action. Invalid admin token.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
+        if not has_admin_token(request):
+            return Response({'detail': ADMIN_TOKEN_ERROR}, status=status.HTTP_403_FORBIDDEN)
         return super().create(request)
 
 
+@method_decorator(cache_catalog_response, name='dispatch')
 class VehicleDetailView(RetrieveAPIView):
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
 
+    async def aretrieve(self, request, *args, **kwargs):
+        """JSON retrieve() with the async ORM, for the ASGI read path"""
+        plan = get_read_plan(VehicleSerializer)
+        lookup = {self.lookup_field: self.kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        row = await aget_object_or_404(plan.values(self.filter_queryset(self.get_queryset())), **lookup)
+        return Response(plan.serialize([row])[0])
 
+
+@cache_catalog_response
 @api_view(['GET'])
 def vehicle_summary(request):
-    summary = (
-        Vehicle.objects
-        .values('brand')
-        .annotate(total=Count('id'))
-        .order_by('brand')
-    )
-    return Response(summary)
+    return Response(get_vehicle_summary())
+
+
+@cache_catalog_response
+@api_view(['GET'])
+def vehicle_facets(request):
+    """
+    Facet counts for the vehicle filters. Accepts the same filter params as
+    GET /api/vehicles; each facet is computed without its own filter.
+    """
+    return Response(get_vehicle_facets(request.query_params))
+
+
+@api_view(['GET'])
+def vehicle_autocomplete(request):
+    """
+    Typeahead suggestions for brand and model names.
+    Query params: ?prefix=<text>&limit=<n>
+    """
+    prefix = ' '.join(request.query_params.get('prefix', '').split())
+    try:
+        limit = int(request.query_params.get('limit', settings.AUTOCOMPLETE_DEFAULT_LIMIT))
+    except (ValueError, TypeError):
+        limit = settings.AUTOCOMPLETE_DEFAULT_LIMIT
+    limit = max(1, min(limit, settings.AUTOCOMPLETE_MAX_LIMIT))
+
+    if not prefix:
+        return Response({'prefix': prefix, 'suggestions': []})
+    return Response({'prefix': prefix, 'suggestions': get_suggestions(prefix, limit)})
+
+
+@require_GET
+def vehicle_export(request):
+    """
+    Stream the whole catalog, or the part matching the list filters
+    (q/brand/fuel_type/min_price/max_price), as NDJSON (default) or CSV with
+    ?format=ndjson|csv. ?fields=/?omit= and ?ordering= work as on the list.
+
+    Rows are read through a server-side cursor in chunks of
+    EXPORT_CHUNK_SIZE and encoded as they are sent, so memory stays
+    flat for any catalog size. Not cached. This is a plain Django view
+    because DRF reserves ?format= for choosing a renderer.
+    """
+    export_format = get_export_format(request)
+    if export_format is None:
+        return invalid_format_response()
+
+    fieldset = Fieldset.from_request(request)
+    fields = fieldset.select(VehicleSerializer.get_renderable_fields()) if fieldset.is_restricted else None
+    plan = get_read_plan(VehicleSerializer, None if fields is None else tuple(fields))
+
+    # Relevance needs the search rank, which the export doesn't compute
+    ordering = request.GET.get('ordering')
+    if ordering == 'relevance':
+        ordering = None
+    ordering = VEHICLE_ORDERINGS.get(ordering, VEHICLE_ORDERINGS[DEFAULT_VEHICLE_ORDERING])
+
+    # The body is streamed after the middleware has returned, so resolve the
+    # read database (possibly a replica) while the request is routed
+    queryset = filter_vehicles(Vehicle.objects.using(router.db_for_read(Vehicle)).order_by(*ordering), request.GET)
+    rows = plan.values(queryset).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    return streaming_export(plan.iterate(rows), plan.field_names, export_format, 'vehicles')
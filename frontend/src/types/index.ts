@@ -36,6 +36,10 @@ export interface PaginatedResponse<T> {
 export interface VehicleSummary {
   brand: string;
   total: number;
+  fuel_types: Record<string, number>;
+  min_price: number;
+  max_price: number;
+  avg_price: number;
 }
 
 // Form Types